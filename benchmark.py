@@ -0,0 +1,232 @@
+"""
+Mesure des performances de chaque opération sur des vidéos de test générées par ffmpeg (lavfi), ex :
+
+    python -m benchmark --sizes 640x360,1920x1080 --durations 10,60 -o rapport.json
+    python -m benchmark -o apres.json --compare avant.json
+
+Pour chaque opération et chaque entrée : temps écoulé, temps CPU (ffmpeg et ses enfants), mémoire
+maximale, taille de la sortie et vitesse par rapport au temps réel, enregistrés dans un rapport JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ffmpeg_capabilities import ffmpeg_version
+from ffmpeg_command import FfmpegCommand, concat_list_line
+from ffmpeg_jobs import JobPlan
+from ffmpeg_media import FilesInput, MediaObject
+from ffmpeg_presets import dic_presets
+from ffmpeg_progress import format_seconds
+
+BENCHMARK_OPERATIONS = ("compress", "convert", "extract_image", "extract_audio", "rotate", "cut_duration", "crop",
+                        "concatenate_images", "concatenate_videos", "thumbnails")
+DEFAULT_SIZES = "640x360,1280x720"
+DEFAULT_DURATIONS = "10,30"
+FRAMERATE = 25
+
+# Au-delà de cet écart de temps écoulé, la comparaison signale une régression ou une amélioration
+COMPARE_THRESHOLD = 0.10
+
+
+def generate_inputs(work_dir: str, size: str, duration: int) -> dict:
+    """
+    Entrées de test reproductibles (mire testsrc + sinusoïde, encodage bitexact sur un thread),
+    réutilisées si elles existent déjà : vidéo, séquence d'images et liste de concaténation
+    """
+    name = f"{size}_{duration}s"
+    video_path = os.path.join(work_dir, f"{name}.mp4")
+    images_dir = os.path.join(work_dir, f"{name}_images")
+    list_path = os.path.join(work_dir, f"{name}_concat.txt")
+
+    if not os.path.exists(video_path):
+        cmd_command = FfmpegCommand("-v", "error", "-nostdin", "-y")
+        cmd_command.add_input(f"testsrc=size={size}:rate={FRAMERATE}:duration={duration}", "-f", "lavfi")
+        cmd_command.add_input(f"sine=frequency=440:duration={duration}", "-f", "lavfi")
+        cmd_command.add_output(video_path, "-c:v", "libx264", "-preset", "veryfast", "-g", str(2 * FRAMERATE),
+                               "-pix_fmt", "yuv420p", "-c:a", "aac", "-threads", "1", "-fflags", "+bitexact",
+                               "-flags", "+bitexact", "-shortest")
+        subprocess.run(cmd_command.argv(), check=True)
+
+    if not os.path.isdir(images_dir):
+        os.makedirs(images_dir + ".tmp", exist_ok=True)
+        cmd_command = FfmpegCommand("-v", "error", "-nostdin", "-y")
+        cmd_command.add_input(video_path)
+        cmd_command.add_output(os.path.join(images_dir + ".tmp", "image%d.jpeg"), "-an", "-q:v", "3")
+        subprocess.run(cmd_command.argv(), check=True)
+        os.replace(images_dir + ".tmp", images_dir)
+
+    # chemin absolu : ffmpeg résoudrait un chemin relatif depuis le dossier de la liste
+    with open(list_path, "w", encoding="utf-8") as list_file:
+        list_file.write(concat_list_line(os.path.abspath(video_path)) * 2)
+
+    return {"name": name, "video": video_path, "images": os.path.join(images_dir, "image%d.jpeg"),
+            "concat_list": list_path, "duration": duration}
+
+
+def build_operation(operation: str, test_input: dict, output_dir: str) -> tuple:
+    """ (commande, fichier de sortie, durée de média traitée) de l'opération sur l'entrée de test """
+    duration = test_input["duration"]
+    ext = {"extract_audio": ".m4a", "convert": ".mkv", "thumbnails": ".jpg"}.get(operation, ".mp4")
+    output_path = os.path.join(output_dir, f"{test_input['name']}_{operation}{ext}")
+    media = MediaObject(test_input["video"], output_path)
+
+    if operation == "compress":
+        return media.compress(preset=dic_presets["standard"]), output_path, duration
+    if operation == "convert":
+        return media.convert(lossy=False), output_path, duration
+    if operation == "extract_image":
+        return media.extract_image(), output_path, duration
+    if operation == "extract_audio":
+        return media.extract_audio(), output_path, duration
+    if operation == "rotate":
+        return media.rotate("right"), output_path, duration
+    if operation == "crop":
+        return media.crop("iw/2", "ih/2", "iw/4", "ih/4"), output_path, duration
+    if operation == "cut_duration":
+        begin, end = duration // 4, duration * 3 // 4
+        return media.cut_duration(format_seconds(begin), format_seconds(end)), output_path, end - begin
+    if operation == "thumbnails":
+        return media.thumbnails(count=16, sheet=True), output_path, duration
+    if operation == "concatenate_images":
+        cmd = FilesInput(test_input["images"], output_path).concatenate_images(str(FRAMERATE), "23")
+        return cmd, output_path, duration
+    if operation == "concatenate_videos":
+        return FilesInput(test_input["concat_list"], output_path).concatenate_videos(), output_path, 2 * duration
+    raise ValueError(f"Opération inconnue : {operation}")
+
+
+def measure_commands(commands: list) -> dict:
+    """
+    Lance des commandes en parallèle et attend leur fin : temps CPU (utilisateur + système)
+    et mémoire maximale (Mio) d'après os.wait4, indisponibles hors POSIX
+    """
+    processes = [subprocess.Popen(cmd, stdin=subprocess.DEVNULL) for cmd in commands]
+    cpu_s, peak_rss_mb = 0.0, 0.0
+    for process in processes:
+        if hasattr(os, "wait4"):
+            _, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            cpu_s += rusage.ru_utime + rusage.ru_stime
+            # ru_maxrss : en Kio sous Linux, en octets sous macOS
+            rss_bytes = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+            peak_rss_mb = max(peak_rss_mb, rss_bytes / (1 << 20))
+        else:
+            process.wait()
+            cpu_s, peak_rss_mb = None, None
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+    return {"cpu_s": cpu_s, "peak_rss_mb": peak_rss_mb}
+
+
+def run_measured(cmd) -> dict:
+    """ Exécute une commande ou un JobPlan (étape par étape) et cumule les mesures """
+    steps = cmd.steps if isinstance(cmd, JobPlan) else [[cmd]]
+    totals = {"cpu_s": 0.0, "peak_rss_mb": 0.0}
+    start = time.perf_counter()
+    try:
+        for step in steps:
+            measures = measure_commands(step)
+            if measures["cpu_s"] is None:
+                totals = {"cpu_s": None, "peak_rss_mb": None}
+            elif totals["cpu_s"] is not None:
+                totals["cpu_s"] += measures["cpu_s"]
+                totals["peak_rss_mb"] = max(totals["peak_rss_mb"], measures["peak_rss_mb"])
+        if isinstance(cmd, JobPlan) and cmd.on_success is not None:
+            cmd.on_success()
+    finally:
+        if isinstance(cmd, JobPlan):
+            cmd.cleanup()
+    totals["wall_s"] = time.perf_counter() - start
+    return totals
+
+
+def benchmark(operations: list, test_inputs: list, output_dir: str, repeat: int = 1) -> list:
+    results = []
+    for test_input in test_inputs:
+        for operation in operations:
+            runs = []
+            for _ in range(repeat):
+                cmd, output_path, media_duration = build_operation(operation, test_input, output_dir)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                runs.append(run_measured(cmd))
+
+            wall_s = statistics.median(run["wall_s"] for run in runs)
+            cpu_values = [run["cpu_s"] for run in runs if run["cpu_s"] is not None]
+            rss_values = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+            result = {"operation": operation, "input": test_input["name"], "wall_s": round(wall_s, 4),
+                      "wall_s_runs": [round(run["wall_s"], 4) for run in runs],
+                      "cpu_s": round(statistics.median(cpu_values), 4) if cpu_values else None,
+                      "peak_rss_mb": round(max(rss_values), 1) if rss_values else None,
+                      "output_bytes": os.path.getsize(output_path),
+                      "realtime_factor": round(media_duration / wall_s, 2) if wall_s else None}
+            results.append(result)
+            print(f"{result['input']:>16} {operation:<20} {wall_s:8.2f} s  x{result['realtime_factor']}",
+                  file=sys.stderr)
+    return results
+
+
+def compare_reports(baseline: dict, report: dict, threshold: float = COMPARE_THRESHOLD) -> list:
+    """ Lignes de comparaison des temps écoulés entre deux rapports (opérations présentes dans les deux) """
+    old_results = {(result["operation"], result["input"]): result for result in baseline["results"]}
+    lines = []
+    for result in report["results"]:
+        old = old_results.get((result["operation"], result["input"]))
+        if old is None or not old["wall_s"]:
+            continue
+        ratio = result["wall_s"] / old["wall_s"]
+        verdict = "plus lent" if ratio > 1 + threshold else "plus rapide" if ratio < 1 - threshold else "stable"
+        lines.append(f"{result['input']:>16} {result['operation']:<20} {old['wall_s']:8.2f} s -> "
+                     f"{result['wall_s']:8.2f} s  ({ratio - 1:+.0%}, {verdict})")
+    return lines
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Mesure des opérations ffmpeg")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="résolutions des vidéos de test (LxH,LxH...)")
+    parser.add_argument("--durations", default=DEFAULT_DURATIONS, help="durées des vidéos de test en s (10,30...)")
+    parser.add_argument("--operations", default=",".join(BENCHMARK_OPERATIONS), help="opérations mesurées")
+    parser.add_argument("--repeat", type=int, default=1, help="nombre de mesures (la médiane est retenue)")
+    parser.add_argument("--work-dir", help="dossier des vidéos de test (conservées pour les prochaines mesures)")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="rapport JSON")
+    parser.add_argument("--compare", help="rapport précédent à comparer")
+    args = parser.parse_args(argv)
+
+    operations = args.operations.split(",")
+    unknown = set(operations) - set(BENCHMARK_OPERATIONS)
+    if unknown:
+        parser.error(f"opérations inconnues : {', '.join(sorted(unknown))}")
+
+    work_dir = args.work_dir or os.path.join(tempfile.gettempdir(), "ffmpeg_python_benchmark")
+    os.makedirs(work_dir, exist_ok=True)
+    output_dir = tempfile.mkdtemp(prefix="ffmpeg_python_benchmark_out_")
+    try:
+        test_inputs = [generate_inputs(work_dir, size, int(duration))
+                       for size in args.sizes.split(",") for duration in args.durations.split(",")]
+        results = benchmark(operations, test_inputs, output_dir, max(1, args.repeat))
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "ffmpeg": ffmpeg_version(),
+              "platform": platform.platform(), "cpu_count": os.cpu_count(), "python": platform.python_version(),
+              "results": results}
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Rapport enregistré : {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        print("\n".join(compare_reports(baseline, report)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
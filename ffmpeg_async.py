@@ -0,0 +1,128 @@
+"""
+Exécution des commandes ffmpeg avec asyncio (sans thread par encodage), ex :
+
+    runner = AsyncJobRunner(max_workers=4)
+    await asyncio.gather(*(MediaObject(i, o).compress_async(preset=preset, runner=runner, timeout=3600)
+                           for i, o in jobs))
+
+Annuler la tâche (ou dépasser le timeout) tue le processus ffmpeg correspondant.
+"""
+import asyncio
+import contextlib
+import subprocess
+
+from ffmpeg_jobs import JobPlan, default_max_workers
+from ffmpeg_probe import probe_duration
+from ffmpeg_progress import JobProgress, with_progress_args
+
+
+async def _kill(process) -> None:
+    if process.returncode is None:
+        process.kill()
+        await process.wait()
+
+
+async def iter_progress(cmd: list, duration: float = None):
+    """
+    Lance ffmpeg et renvoie (générateur asynchrone) un JobProgress à chaque bloc de -progress.
+    Lève CalledProcessError si ffmpeg échoue ; arrêter l'itération avant la fin tue ffmpeg.
+    """
+    process = await asyncio.create_subprocess_exec(*with_progress_args(cmd), stdout=subprocess.PIPE)
+    try:
+        block = {}
+        async for line in process.stdout:
+            key, sep, value = line.decode("utf-8", errors="replace").strip().partition("=")
+            if not sep:
+                continue
+            block[key] = value
+            if key == "progress":
+                yield JobProgress(block, duration)
+                block = {}
+        returncode = await process.wait()
+    finally:
+        await _kill(process)
+
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+async def run_plan_async(plan: JobPlan, on_progress=None, duration: float = None, input_path: str = None,
+                         slots: asyncio.Semaphore = None) -> None:
+    """
+    Exécute un JobPlan ; à la première erreur, les autres commandes de l'étape sont annulées.
+    slots : places partagées avec les autres jobs (voir run_command_async), qui bornent le nombre de ffmpeg
+    d'une étape lancés en même temps
+    """
+    try:
+        for step in plan.steps:
+            if len(step) == 1:
+                await run_command_async(step[0], on_progress, duration, input_path, slots)
+                continue
+            tasks = [asyncio.ensure_future(run_command_async(cmd, slots=slots)) for cmd in step]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        if plan.on_success is not None:
+            plan.on_success()
+    finally:
+        plan.cleanup()
+
+
+async def run_command_async(cmd, on_progress=None, duration: float = None, input_path: str = None,
+                            slots: asyncio.Semaphore = None) -> None:
+    """
+    Équivalent asynchrone de run_command : lance la commande (ou le JobPlan) et attend sa fin.
+    Si on_progress est donné, il reçoit un JobProgress à chaque bloc de -progress.
+    slots : sémaphore dont chaque ffmpeg prend une place le temps de son exécution
+    """
+    if isinstance(cmd, JobPlan):
+        await run_plan_async(cmd, on_progress, duration, input_path, slots)
+        return
+
+    if duration is None and input_path is not None and on_progress is not None:
+        duration = await asyncio.to_thread(probe_duration, input_path)
+
+    async with slots if slots is not None else contextlib.nullcontext():
+        await _run_process_async(cmd, on_progress, duration)
+
+
+async def _run_process_async(cmd: list, on_progress, duration: float) -> None:
+    if on_progress is None:
+        process = await asyncio.create_subprocess_exec(*cmd)
+        try:
+            returncode = await process.wait()
+        finally:
+            await _kill(process)
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        return
+
+    async with contextlib.aclosing(iter_progress(cmd, duration)) as progresses:
+        async for progress in progresses:
+            on_progress(progress)
+
+
+async def run_async(cmd, on_progress=None, duration: float = None, input_path: str = None,
+                    timeout: float = None, slots: asyncio.Semaphore = None) -> None:
+    """ run_command_async avec un délai maximal (asyncio.TimeoutError, ffmpeg étant alors tué) """
+    await asyncio.wait_for(run_command_async(cmd, on_progress, duration, input_path, slots), timeout)
+
+
+class AsyncJobRunner:
+    """ Limite le nombre de ffmpeg lancés en même temps par les coroutines qui partagent ce runner """
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or default_max_workers()
+        self.semaphore = asyncio.Semaphore(self.max_workers)
+
+
+    async def run(self, cmd, on_progress=None, duration: float = None, input_path: str = None,
+                  timeout: float = None) -> None:
+        """
+        Exécute la commande : chacun de ses ffmpeg, y compris ceux des étapes parallèles d'un JobPlan,
+        attend une place libre (le timeout compte cette attente)
+        """
+        await run_async(cmd, on_progress, duration, input_path, timeout, self.semaphore)
@@ -0,0 +1,264 @@
+"""
+Audio décodé par ffmpeg en PCM sur un pipe, par morceaux de tableaux NumPy (sans WAV intermédiaire), ex :
+
+    with AudioReader("film.mkv", sample_rate=16000, channels="mono") as reader:
+        for samples in reader:        # tableau (nb d'échantillons, nb de canaux) en float32
+            print(window_rms(samples, 1600).max())
+
+    levels = analyze("episode.mp4")   # RMS, crête et sonie par fenêtre de 400 ms
+
+NumPy est nécessaire pour ce module uniquement (pip install numpy).
+"""
+import subprocess
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ffmpeg_command import FfmpegCommand, FilterGraph
+from ffmpeg_probe import probe
+
+# Formats d'échantillons gérés : (type des valeurs, valeur pleine échelle)
+dic_sample_fmts = {"f32le": ("float32", 1.0), "s16le": ("int16", 32768.0), "s32le": ("int32", 2147483648.0)}
+
+# Nombre de canaux des dispositions usuelles
+dic_layout_channels = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "7.1": 8}
+
+# Pondération K de la norme ITU-R BS.1770 (plateau à +4 dB dans les aigus, puis passe-haut à 38 Hz)
+K_WEIGHTING_FILTERS = ["highshelf=f=1681:g=4:t=q:w=0.7071", "highpass=f=38:t=q:w=0.5"]
+
+# Plancher des valeurs en dB (silence numérique)
+DB_FLOOR = -120.0
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy est nécessaire pour lire l'audio décodé : pip install numpy")
+
+
+class AudioReader:
+    """
+    Lit l'audio d'un fichier, décodé par ffmpeg en PCM entrelacé, au rythme de chunk_seconds.
+    Chaque morceau est une vue sur un tampon réutilisé : il est écrasé par la lecture du suivant.
+    sample_rate / channels (nombre ou disposition : "mono", "stereo"...) : conversion faite par ffmpeg
+    (par défaut, ceux du fichier) ; k_weighting : pondération K appliquée par ffmpeg, pour window_loudness ;
+    with_k_weighted : chaque morceau a 2 × channels colonnes, les canaux d'origine puis leur copie pondérée K
+    (un seul décodage, dupliqué par asplit dans le même ffmpeg)
+    """
+    def __init__(self, input_path: str, sample_rate: int = None, channels=None, sample_fmt: str = "f32le",
+                 chunk_seconds: float = 1.0, start: float = None, end: float = None, stream_index: int = 0,
+                 k_weighting: bool = False, with_k_weighted: bool = False):
+        require_numpy()
+        if sample_fmt not in dic_sample_fmts:
+            raise ValueError(f"Format d'échantillons non géré : {sample_fmt}")
+
+        info = probe(input_path)
+        if not info.has_audio:
+            raise ValueError(f"Pas de flux audio dans {input_path}")
+        self.input_path = input_path
+        self.sample_rate = int(sample_rate or info.sample_rate or 48000)
+        if isinstance(channels, str):
+            self.layout = channels
+            self.channels = dic_layout_channels[channels]
+        else:
+            self.layout = None
+            self.channels = int(channels or info.channels or 2)
+        self.sample_fmt = sample_fmt
+        self.start = start
+        self.end = end
+        self.stream_index = stream_index
+        self.k_weighting = k_weighting
+        self.with_k_weighted = with_k_weighted
+
+        dtype, self.full_scale = dic_sample_fmts[sample_fmt]
+        nb_columns = 2 * self.channels if with_k_weighted else self.channels
+        self.buffer = np.empty((max(1, round(chunk_seconds * self.sample_rate)), nb_columns), dtype=dtype)
+        self.buffer_bytes = memoryview(self.buffer).cast("B")
+        self.frame_bytes = self.buffer.itemsize * nb_columns
+        self.process = None
+        self.finished = False
+
+
+    def command(self) -> list:
+        cmd_command = FfmpegCommand("-nostdin", "-v", "error")
+        cmd_command.add_input(self.input_path, *(["-ss", f"{self.start:.6f}"] if self.start else []))
+        if self.with_k_weighted:
+            return self.split_command(cmd_command)
+
+        audio_filters = list(K_WEIGHTING_FILTERS) if self.k_weighting else []
+        if self.layout:
+            audio_filters.append(f"aformat=channel_layouts={self.layout}")
+        cmd_command.add_audio_filter(*audio_filters)
+
+        output_options = ["-map", f"0:a:{self.stream_index}"]
+        if self.end is not None:
+            output_options += ["-t", f"{self.end - (self.start or 0):.6f}"]
+        cmd_command.add_output("pipe:1", *output_options, "-vn", "-sn", "-dn", "-f", self.sample_fmt,
+                               "-c:a", f"pcm_{self.sample_fmt}", "-ar", self.sample_rate, "-ac", self.channels)
+        return cmd_command.argv()
+
+
+    def split_command(self, cmd_command: FfmpegCommand) -> list:
+        """ Audio d'origine et audio pondéré K côte à côte (amerge) : taux et canaux convertis avant le split """
+        layout = self.layout or f"{self.channels}c"
+        filter_graph = FilterGraph()
+        filter_graph.add([f"0:a:{self.stream_index}"],
+                         [f"aformat=sample_rates={self.sample_rate}:channel_layouts={layout}", "asplit=2"],
+                         ["original", "to_weight"])
+        filter_graph.add(["to_weight"], K_WEIGHTING_FILTERS, ["weighted"])
+        filter_graph.add(["original", "weighted"], ["amerge=inputs=2"], ["out"])
+        cmd_command.set_filter_graph(filter_graph)
+
+        output_options = ["-map", "[out]"]
+        if self.end is not None:
+            output_options += ["-t", f"{self.end - (self.start or 0):.6f}"]
+        cmd_command.add_output("pipe:1", *output_options, "-f", self.sample_fmt, "-c:a", f"pcm_{self.sample_fmt}")
+        return cmd_command.argv()
+
+
+    def read(self):
+        """ Morceau suivant (nb d'échantillons, nb de canaux), plus court à la fin ; None quand tout est lu """
+        if self.finished:
+            return None
+        if self.process is None:
+            self.process = subprocess.Popen(self.command(), stdout=subprocess.PIPE, bufsize=0)
+
+        received = 0
+        while received < len(self.buffer_bytes):
+            nb_bytes = self.process.stdout.readinto(self.buffer_bytes[received:])
+            if not nb_bytes:
+                break
+            received += nb_bytes
+
+        if received < len(self.buffer_bytes):
+            self._finish()
+        nb_samples = received // self.frame_bytes
+        return self.buffer[:nb_samples] if nb_samples else None
+
+
+    def _finish(self) -> None:
+        process, self.process = self.process, None
+        self.finished = True
+        process.stdout.close()
+        returncode = process.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, process.args)
+
+
+    def read_all(self):
+        """ Tout l'audio en un seul tableau (copié) """
+        return np.concatenate([chunk.copy() for chunk in self] or [self.buffer[:0]])
+
+
+    def normalized(self, samples):
+        """ Échantillons en float32 entre -1 et 1, quel que soit sample_fmt """
+        if self.sample_fmt == "f32le":
+            return samples
+        return samples.astype(np.float32) / self.full_scale
+
+
+    def close(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+            self.process.stdout.close()
+            self.process.wait()
+            self.process = None
+
+
+    def __iter__(self):
+        while True:
+            chunk = self.read()
+            if chunk is None:
+                return
+            yield chunk
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _windows(samples, window: int):
+    """ (nb de fenêtres, window, nb de canaux) ; la fin incomplète est complétée par des zéros """
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    nb_windows = -(-len(samples) // window)
+    if nb_windows * window != len(samples):
+        samples = np.concatenate([samples, np.zeros((nb_windows * window - len(samples), samples.shape[1]),
+                                                    dtype=samples.dtype)])
+    return samples.reshape(nb_windows, window, samples.shape[1])
+
+
+def window_rms(samples, window: int):
+    """ Valeur efficace de chaque fenêtre de window échantillons, par canal : (nb de fenêtres, nb de canaux) """
+    windows = _windows(samples, window)
+    return np.sqrt(np.einsum("wsc,wsc->wc", windows, windows) / window)
+
+
+def window_peak(samples, window: int):
+    """ Crête (valeur absolue maximale) de chaque fenêtre, par canal """
+    return np.abs(_windows(samples, window)).max(axis=1)
+
+
+def to_db(values):
+    """ Amplitudes (pleine échelle = 1) -> dBFS """
+    return np.maximum(20 * np.log10(np.maximum(values, 1e-12)), DB_FLOOR)
+
+
+def window_loudness(samples, window: int, channel_weights=None):
+    """
+    Sonie de chaque fenêtre en LUFS (BS.1770, sans portillonnage), à partir d'échantillons pondérés K
+    (AudioReader(..., k_weighting=True)) ; channel_weights : 1.41 pour les canaux surround, 1 par défaut
+    """
+    windows = _windows(samples, window)
+    mean_square = np.einsum("wsc,wsc->wc", windows, windows) / window
+    weights = np.ones(windows.shape[2]) if channel_weights is None else np.asarray(channel_weights)
+    power = mean_square @ weights
+    return np.maximum(-0.691 + 10 * np.log10(np.maximum(power, 1e-12)), DB_FLOOR)
+
+
+def analyze(input_path: str, window_seconds: float = 0.4, sample_rate: int = 48000,
+            windows_per_chunk: int = 25) -> dict:
+    """
+    Niveaux d'un fichier par fenêtre de window_seconds : rms et peak en dBFS (par canal),
+    loudness en LUFS, et integrated_loudness (sonie intégrée avec portillonnage BS.1770).
+    rms et peak sont mesurés sur l'audio d'origine, la sonie sur l'audio pondéré K : les deux sortent
+    du même ffmpeg, qui ne décode le fichier qu'une fois.
+    """
+    window = max(1, round(window_seconds * sample_rate))
+    chunk_seconds = window * windows_per_chunk / sample_rate
+    rms, peak, loudness = [], [], []
+    with AudioReader(input_path, sample_rate=sample_rate, chunk_seconds=chunk_seconds,
+                     with_k_weighted=True) as reader:
+        for chunk in reader:
+            samples = reader.normalized(chunk)
+            original, weighted = samples[:, :reader.channels], samples[:, reader.channels:]
+            rms.append(window_rms(original, window))
+            peak.append(window_peak(original, window))
+            loudness.append(window_loudness(weighted, window))
+
+    loudness = np.concatenate(loudness) if loudness else np.empty(0)
+    return {"window_seconds": window / sample_rate,
+            "rms": to_db(np.concatenate(rms)) if rms else np.empty((0, 0)),
+            "peak": to_db(np.concatenate(peak)) if peak else np.empty((0, 0)),
+            "loudness": loudness,
+            "integrated_loudness": gated_loudness(loudness)}
+
+
+def gated_loudness(loudness):
+    """ Sonie intégrée (LUFS) : moyenne des fenêtres au-dessus de -70 LUFS, puis de celles à -10 LU au plus """
+    blocks = loudness[loudness > -70]
+    if not len(blocks):
+        return DB_FLOOR
+    relative_gate = _mean_loudness(blocks) - 10
+    blocks = blocks[blocks > relative_gate]
+    return _mean_loudness(blocks) if len(blocks) else DB_FLOOR
+
+
+def _mean_loudness(blocks) -> float:
+    return float(10 * np.log10(np.mean(10 ** ((blocks + 0.691) / 10))) - 0.691)
@@ -0,0 +1,81 @@
+import glob
+import os
+
+from ffmpeg_jobs import JobExecutor
+from ffmpeg_media import MediaObject
+
+# Opérations de MediaObject applicables à tout un dossier
+BATCH_OPERATIONS = ("compress", "convert", "extract_audio", "rotate", "crop", "cut_duration")
+
+# En dessous de 2 threads par ffmpeg, le coût de lancement des processus domine
+MIN_THREADS_PAR_JOB = 2
+
+
+def list_batch_inputs(source: str, input_ext: str = None) -> list:
+    """ Liste les fichiers d'un dossier ou d'un motif glob (ex : "C:/videos/*.mov"), triés par nom """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source)
+
+    files = [path for path in paths if os.path.isfile(path)]
+    if input_ext:
+        files = [path for path in files if os.path.splitext(path)[1].lower() == input_ext.lower()]
+    return sorted(files)
+
+
+def batch_parallelism(nb_files: int, max_workers: int = None, nb_cpus: int = None) -> tuple:
+    """
+    Renvoie (nb de ffmpeg en parallèle, valeur de -threads pour chacun)
+    de sorte que nb_workers * threads corresponde au nombre de coeurs, sans le dépasser.
+    """
+    nb_cpus = nb_cpus or os.cpu_count() or 1
+    nb_workers = max(1, nb_cpus // MIN_THREADS_PAR_JOB)
+    if max_workers:
+        nb_workers = min(nb_workers, max_workers)
+    nb_workers = max(1, min(nb_workers, nb_files))
+    threads = max(1, nb_cpus // nb_workers)
+    return nb_workers, threads
+
+
+def make_batch_command(operation: str, **options):
+    """ Fabrique la fonction qui construit la commande ffmpeg d'un fichier du lot """
+    def make_command(input_path, output_path, threads):
+        return getattr(MediaObject(input_path, output_path, threads=threads), operation)(**options)
+    return make_command
+
+
+def build_batch_jobs(input_files: list, output_dir: str, output_ext: str, make_command, threads: int = None) -> list:
+    """
+    Construit la liste des jobs (commande, fichier d'entrée, fichier de sortie).
+    make_command(input_path, output_path, threads) renvoie la commande ffmpeg d'un fichier.
+    Sans output_ext, chaque sortie garde l'extension de son entrée.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    for input_file in input_files:
+        stem, input_ext = os.path.splitext(os.path.basename(input_file))
+        output_file = os.path.join(output_dir, stem + (output_ext or input_ext))
+        jobs.append((make_command(input_file, output_file, threads), input_file, output_file))
+    return jobs
+
+
+def run_batch(source: str, output_dir: str, output_ext: str, make_command, input_ext: str = None,
+              max_workers: int = None) -> list:
+    """ Exécute tout un lot et attend la fin : renvoie la liste des (fichier de sortie, erreur ou None) """
+    input_files = list_batch_inputs(source, input_ext)
+    if not input_files:
+        return []
+
+    nb_workers, threads = batch_parallelism(len(input_files), max_workers)
+    jobs = build_batch_jobs(input_files, output_dir, output_ext, make_command, threads)
+
+    results = []
+    executor = JobExecutor(max_workers=nb_workers)
+    for cmd, _, out in jobs:
+        executor.submit(cmd, out,
+                        on_success=lambda o: results.append((o, None)),
+                        on_error=lambda o, e: results.append((o, e)))
+    executor.join()
+    executor.shutdown()
+    return results
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from ffmpeg_capabilities import ffmpeg_version
+from ffmpeg_probe import CACHE_DIR, files_fingerprints
+
+OUTPUT_CACHE_DIR = CACHE_DIR / "outputs"
+OUTPUT_CACHE_MAX_BYTES = 5 << 30  # 5 Gio
+
+# Options sans effet sur le résultat, retirées de la commande avant de calculer la clé
+IGNORED_OPTIONS = {"-threads": 1, "-y": 0, "-n": 0, "-nostats": 0, "-progress": 1}
+
+
+def normalize_argv(argv: list, input_paths: list, output_path: str, temp_dir: str = None) -> list:
+    """
+    Commande indépendante de l'emplacement des fichiers : entrées, sortie et dossier temporaire
+    sont remplacés par des marqueurs (l'extension de la sortie est conservée, elle choisit le conteneur)
+    """
+    placeholders = {os.path.abspath(path): f"<entrée {idx}>" for idx, path in enumerate(input_paths)}
+    placeholders[os.path.abspath(output_path)] = "<sortie>" + os.path.splitext(output_path)[1]
+
+    normalized = []
+    skip = 0
+    for arg in argv:
+        if skip:
+            skip -= 1
+            continue
+        if arg in IGNORED_OPTIONS:
+            skip = IGNORED_OPTIONS[arg]
+            continue
+        arg = placeholders.get(os.path.abspath(arg), arg)
+        if temp_dir is not None:
+            arg = arg.replace(temp_dir, "<temp>")
+        normalized.append(arg)
+    return normalized
+
+
+class OutputCache:
+    """
+    Cache des fichiers produits, adressé par le contenu : la clé combine l'empreinte des entrées,
+    la commande normalisée et la version de ffmpeg. Les entrées les moins récemment utilisées
+    sont supprimées au-delà de max_bytes.
+    """
+    def __init__(self, cache_dir=OUTPUT_CACHE_DIR, max_bytes: int = OUTPUT_CACHE_MAX_BYTES):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+
+    def key(self, cmd, input_paths: list, output_path: str):
+        """ Clé du résultat de la commande (ou JobPlan), None si le résultat ne peut pas être mis en cache """
+        version = ffmpeg_version()
+        if version is None or not input_paths or not all(os.path.isfile(path) for path in input_paths):
+            return None
+
+        # JobPlan : toutes les commandes de toutes les étapes
+        temp_dir = getattr(cmd, "temp_dir", None)
+        commands = [step_cmd for step in cmd.steps for step_cmd in step] if hasattr(cmd, "steps") else [cmd]
+        normalized = [normalize_argv(step_cmd, input_paths, output_path, temp_dir) for step_cmd in commands]
+
+        try:
+            fingerprints = files_fingerprints(input_paths)
+        except OSError:
+            return None
+        description = json.dumps([version, fingerprints, normalized])
+        return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+
+    def entry_path(self, key: str, output_path: str) -> str:
+        return os.path.join(self.cache_dir, key + os.path.splitext(output_path)[1])
+
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """ Place le résultat en cache à output_path (lien physique, sinon copie) ; False s'il n'y est pas """
+        entry = self.entry_path(key, output_path)
+        with self.lock:
+            if not os.path.isfile(entry):
+                return False
+            os.utime(entry)  # dernière utilisation, pour l'éviction
+        _link_or_copy(entry, output_path)
+        return True
+
+
+    def store(self, key: str, output_path: str) -> None:
+        """ Ajoute le fichier produit au cache, puis évince les entrées les plus anciennes si besoin """
+        if not os.path.isfile(output_path):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            _link_or_copy(output_path, self.entry_path(key, output_path))
+        except OSError as e:
+            print(f"Impossible d'ajouter {output_path} au cache : {e}")
+            return
+        with self.lock:
+            self.evict()
+
+
+    def evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """ Remplace destination par un lien physique vers source (une copie si c'est impossible) """
+    tmp_path = destination + ".tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:  # autre système de fichiers, liens non gérés...
+        shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def detach_output(output_path: str) -> None:
+    """
+    Supprime la sortie si elle partage ses données avec une entrée du cache (lien physique),
+    pour que ffmpeg ne réécrive pas le fichier en cache en l'écrasant
+    """
+    try:
+        if os.stat(output_path).st_nlink > 1:
+            os.remove(output_path)
+    except OSError:
+        pass
+
+
+output_cache = OutputCache()
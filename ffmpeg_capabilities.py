@@ -0,0 +1,238 @@
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+from ffmpeg_probe import CACHE_DIR
+from ffmpeg_supported_ext import dic_codec_encoders, dic_muxer_default_encoders, list_ffmpeg_demuxer_supported, \
+    list_ffmpeg_muxer_supported
+
+CAPABILITIES_FILE = CACHE_DIR / "capabilities.json"
+
+# Extensions de fichiers qui ne portent pas le nom du format ffmpeg correspondant
+dic_ext_formats = {"mkv": "matroska", "mka": "matroska", "mk3d": "matroska", "ts": "mpegts", "m2ts": "mpegts",
+                   "mts": "mpegts", "m4v": "mp4", "m4a": "ipod", "mpg": "mpeg", "vob": "mpeg", "oga": "ogg",
+                   "ogv": "ogg", "wmv": "asf", "wma": "asf", "aif": "aiff", "vtt": "webvtt", "yuv": "rawvideo",
+                   "jpg": "image2", "jpeg": "image2", "png": "image2", "bmp": "image2", "tif": "image2",
+                   "tiff": "image2", "webp": "image2", "txt": "concat"}
+
+
+_ffmpeg_version = None
+
+
+def ffmpeg_version():
+    """ Première ligne de "ffmpeg -version" (None si ffmpeg est introuvable) """
+    global _ffmpeg_version
+    if _ffmpeg_version is None:
+        try:
+            result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True)
+            _ffmpeg_version = result.stdout.partition("\n")[0]
+        except (OSError, subprocess.CalledProcessError):
+            _ffmpeg_version = ""
+    return _ffmpeg_version or None
+
+
+def _ffmpeg_lines(option: str) -> list:
+    result = subprocess.run(["ffmpeg", "-hide_banner", option], capture_output=True, text=True,
+                            encoding="utf-8", errors="replace", check=True)
+    return result.stdout.splitlines()
+
+
+def _flagged_lines(lines: list):
+    """
+    Lignes de la liste qui suit la légende et la ligne de tirets : (drapeaux, nom, description).
+    Les drapeaux ont la largeur des exemples de la légende (" D.. = Demuxing supported"), la colonne
+    des périphériques ("d") ayant été ajoutée au fil des versions.
+    """
+    width = None
+    for idx, line in enumerate(lines):
+        if line.strip().startswith("--"):
+            break
+        if "=" in line and width is None:
+            width = len(line.split()[0])
+    else:
+        return
+    for line in lines[idx + 1:]:
+        flags, fields = line[1:1 + width], line[1 + width:].split(None, 1)
+        if fields:
+            yield flags, fields[0], fields[1] if len(fields) > 1 else ""
+
+
+def parse_formats(lines: list) -> tuple:
+    """ "ffmpeg -formats" -> (démuxeurs, muxeurs) ; "mov,mp4,m4a" donne trois noms """
+    demuxers, muxers = set(), set()
+    for flags, names, _ in _flagged_lines(lines):
+        if "D" in flags:
+            demuxers.update(names.split(","))
+        if "E" in flags:
+            muxers.update(names.split(","))
+    return demuxers, muxers
+
+
+def parse_codecs(lines: list) -> tuple:
+    """ "ffmpeg -codecs" -> (codecs décodables, {codec: [encodeurs]}) """
+    decoders, codec_encoders = set(), {}
+    for flags, codec, description in _flagged_lines(lines):
+        if flags.startswith("D"):
+            decoders.add(codec)
+        if flags[1:2] == "E":
+            _, found, encoders = description.partition("(encoders:")
+            codec_encoders[codec] = encoders.partition(")")[0].split() if found else [codec]
+    return decoders, codec_encoders
+
+
+def parse_encoders(lines: list) -> dict:
+    """ "ffmpeg -encoders" -> {encodeur: "video" | "audio" | "subtitle"} """
+    dic_types = {"V": "video", "A": "audio", "S": "subtitle"}
+    return {encoder: dic_types[flags[0]] for flags, encoder, _ in _flagged_lines(lines) if flags[:1] in dic_types}
+
+
+def parse_filters(lines: list) -> set:
+    """ "ffmpeg -filters" -> noms des filtres (lignes "flags nom entrées->sorties description") """
+    filters = set()
+    for line in lines:
+        fields = line.split(None, 3)
+        if len(fields) >= 3 and "->" in fields[2]:
+            filters.add(fields[1])
+    return filters
+
+
+class Capabilities:
+    """
+    Ce que sait faire le ffmpeg installé : formats, codecs, encodeurs et filtres, en ensembles
+    (recherches en temps constant). detected est False si ffmpeg n'a pas pu être interrogé :
+    les listes figées de ffmpeg_supported_ext sont alors utilisées.
+    """
+    def __init__(self, data: dict, detected: bool = True):
+        self.detected = detected
+        self.demuxers = frozenset(data["demuxers"])
+        self.muxers = frozenset(data["muxers"])
+        self.decoders = frozenset(data["decoders"])
+        self.codec_encoders = {codec: tuple(encoders) for codec, encoders in data["codec_encoders"].items()}
+        self.encoders = dict(data["encoders"])
+        self.filters = frozenset(data["filters"])
+
+
+    @staticmethod
+    def format_for_ext(ext: str) -> str:
+        """ ".MKV" -> "matroska", ".mp4" -> "mp4" """
+        ext = ext.lower().lstrip(".")
+        return dic_ext_formats.get(ext, ext)
+
+
+    def can_demux_ext(self, ext: str) -> bool:
+        ext = ext.lower().lstrip(".")
+        return ext in self.demuxers or self.format_for_ext(ext) in self.demuxers
+
+
+    def can_mux_ext(self, ext: str) -> bool:
+        ext = ext.lower().lstrip(".")
+        return ext in self.muxers or self.format_for_ext(ext) in self.muxers
+
+
+    def has_encoder(self, encoder: str) -> bool:
+        return not self.detected or encoder in self.encoders
+
+
+    def has_filter(self, name: str) -> bool:
+        return not self.detected or name in self.filters
+
+
+    def best_encoder(self, preferred: str, codec: str = None):
+        """
+        L'encodeur préféré s'il est compilé dans ffmpeg, sinon un autre encodeur du même codec
+        (ex : libopenh264 à la place de libx264), None s'il n'y en a aucun
+        """
+        if preferred is None or self.has_encoder(preferred):
+            return preferred
+        if codec is None:
+            codec = self.codec_of(preferred)
+        alternatives = [encoder for encoder in self.codec_encoders.get(codec, ()) if encoder in self.encoders]
+        return alternatives[0] if alternatives else None
+
+
+    def codec_of(self, encoder: str):
+        """ "libx265" -> "hevc" (None si l'encodeur est inconnu) """
+        return next((codec for codec, encoders in self.codec_encoders.items() if encoder in encoders), None)
+
+
+    def to_dict(self) -> dict:
+        return {"demuxers": sorted(self.demuxers), "muxers": sorted(self.muxers), "decoders": sorted(self.decoders),
+                "codec_encoders": {codec: list(encoders) for codec, encoders in self.codec_encoders.items()},
+                "encoders": self.encoders, "filters": sorted(self.filters)}
+
+
+def detect_capabilities() -> Capabilities:
+    """ Interroge ffmpeg (-formats, -codecs, -encoders, -filters) """
+    demuxers, muxers = parse_formats(_ffmpeg_lines("-formats"))
+    if not demuxers or not muxers:
+        raise ValueError("Sortie de \"ffmpeg -formats\" illisible")
+    decoders, codec_encoders = parse_codecs(_ffmpeg_lines("-codecs"))
+    return Capabilities({"demuxers": demuxers, "muxers": muxers, "decoders": decoders, "codec_encoders": codec_encoders,
+                         "encoders": parse_encoders(_ffmpeg_lines("-encoders")),
+                         "filters": parse_filters(_ffmpeg_lines("-filters"))})
+
+
+def static_capabilities() -> Capabilities:
+    """ Capacités supposées, d'après les listes figées de ffmpeg_supported_ext """
+    encoders = set(dic_codec_encoders.values())
+    for default_encoders in dic_muxer_default_encoders.values():
+        encoders.update(default_encoders.values())
+    return Capabilities({"demuxers": [name for ext in list_ffmpeg_demuxer_supported
+                                      for name in ext.lstrip(".").split(",")],
+                         "muxers": [name for ext in list_ffmpeg_muxer_supported for name in ext.lstrip(".").split(",")],
+                         "decoders": [], "codec_encoders": {},
+                         "encoders": {encoder: None for encoder in encoders}, "filters": []}, detected=False)
+
+
+def _binary_key():
+    """ Clé du cache : chemin et version du binaire ffmpeg (None si ffmpeg est introuvable) """
+    version = ffmpeg_version()
+    if version is None:
+        return None
+    return f"{shutil.which('ffmpeg')}|{version}"
+
+
+def load_capabilities(cache_file=CAPABILITIES_FILE) -> Capabilities:
+    """ Capacités du ffmpeg installé, relues du cache tant que le binaire n'a pas changé de version """
+    key = _binary_key()
+    if key is None:
+        return static_capabilities()
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        cached = {}
+    if key in cached:
+        return Capabilities(cached[key])
+
+    try:
+        capabilities = detect_capabilities()
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return static_capabilities()
+
+    cached[key] = capabilities.to_dict()
+    try:
+        os.makedirs(os.path.dirname(str(cache_file)), exist_ok=True)
+        tmp_file = str(cache_file) + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(cached, file)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Impossible d'enregistrer le cache des capacités de ffmpeg : {e}")
+    return capabilities
+
+
+_capabilities = None
+_capabilities_lock = threading.Lock()
+
+
+def get_capabilities() -> Capabilities:
+    """ Capacités de ffmpeg, chargées une seule fois par exécution """
+    global _capabilities
+    with _capabilities_lock:
+        if _capabilities is None:
+            _capabilities = load_capabilities()
+        return _capabilities
@@ -0,0 +1,136 @@
+"""
+Lancement des opérations sans interface graphique (pas d'import de Tk), ex :
+
+    python -m ffmpeg_cli compress in.mp4 out.mp4 --preset "ingestion rapide"
+    python -m ffmpeg_cli rotate in.mp4 out.mp4 -o rotation=right
+    python -m ffmpeg_cli cut_duration in.mp4 out.mp4 -o begin=00:01:00 -o end=00:02:30 -o smart=true
+    python -m ffmpeg_cli compress "videos/*.mov" sortie/ --batch --ext .mp4
+    python -m ffmpeg_cli --spec jobs.json -j 4
+    python -m ffmpeg_cli --resume   (relance les jobs de l'interface restés en attente ou interrompus)
+
+Un fichier de jobs contient un job ou une liste de jobs au format JSON :
+    {"operation": "compress", "inputs": ["in.mp4"], "output": "out.mp4", "options": {"preset": "standard"}}
+"""
+import argparse
+import json
+import shlex
+import sys
+
+from ffmpeg_batch import batch_parallelism, build_batch_jobs, list_batch_inputs, make_batch_command
+from ffmpeg_jobs import JobExecutor, JobPlan
+from ffmpeg_media import FILES_OPERATIONS, MEDIA_OPERATIONS, build_job, job_cache_inputs, normalize_options
+from ffmpeg_queue import JobQueue
+
+
+def parse_option(text: str) -> tuple:
+    """ "clé=valeur" -> (clé, valeur), la valeur étant lue en JSON quand c'est possible (nombres, true...) """
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def load_specs(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as file:
+        specs = json.load(file)
+    return specs if isinstance(specs, list) else [specs]
+
+
+def describe(cmd) -> str:
+    if isinstance(cmd, JobPlan):
+        return "\n".join(f"[étape {idx + 1}] {shlex.join(step_cmd)}"
+                         for idx, step in enumerate(cmd.steps) for step_cmd in step)
+    return shlex.join(cmd)
+
+
+def run_jobs(jobs: list, max_workers: int = None, quiet: bool = False) -> int:
+    """
+    Exécute les jobs (commande, fichier d'entrée, fichier de sortie, fichiers lus pour le cache) ;
+    renvoie le code de sortie du programme
+    """
+    failures = []
+    executor = JobExecutor(max_workers=max_workers)
+    for cmd, input_path, out, cache_inputs in jobs:
+        executor.submit(cmd, out,
+                        on_success=lambda o: print(f"Conversion réussie : {o} a été créé."),
+                        on_error=lambda o, e: failures.append(o) or print(f"Erreur ({o}) : {e}", file=sys.stderr),
+                        on_progress=None if quiet else lambda o, p: print(f"{o} : {p}", file=sys.stderr),
+                        input_path=input_path, cache_inputs=cache_inputs)
+    executor.join()
+    executor.shutdown()
+    return 1 if failures else 0
+
+
+def resume_jobs(max_workers: int = None, quiet: bool = False) -> int:
+    """ Relance les jobs de la file persistante restés en attente ou interrompus """
+    failures = []
+    job_queue = JobQueue()
+    executor = JobExecutor(max_workers=max_workers)
+    for job_id, spec in job_queue.resume():
+        job_queue.submit(executor, job_id, spec,
+                         on_success=lambda o: print(f"Conversion réussie : {o} a été créé."),
+                         on_error=lambda o, e: failures.append(o) or print(f"Erreur ({o}) : {e}", file=sys.stderr),
+                         on_progress=None if quiet else lambda o, p: print(f"{o} : {p}", file=sys.stderr))
+    executor.join()
+    executor.shutdown()
+    return 1 if failures else 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m ffmpeg_cli", description="Opérations ffmpeg sans interface")
+    parser.add_argument("operation", nargs="?", choices=MEDIA_OPERATIONS + FILES_OPERATIONS)
+    parser.add_argument("input", nargs="?", help="fichier d'entrée (dossier ou motif glob avec --batch)")
+    parser.add_argument("output", nargs="?", help="fichier de sortie (dossier avec --batch)")
+    parser.add_argument("-o", "--option", action="append", default=[], type=parse_option, metavar="CLÉ=VALEUR",
+                        help="paramètre de l'opération (répétable)")
+    parser.add_argument("--preset", help="préréglage d'encodage nommé")
+    parser.add_argument("--threads", type=int, help="valeur de -threads de ffmpeg")
+    parser.add_argument("--batch", action="store_true", help="appliquer l'opération à tous les fichiers de l'entrée")
+    parser.add_argument("--ext", help="extension des fichiers de sortie avec --batch (par défaut celle de l'entrée)")
+    parser.add_argument("--spec", help="fichier JSON décrivant un ou plusieurs jobs")
+    parser.add_argument("--resume", action="store_true", help="relancer les jobs en attente de la file persistante")
+    parser.add_argument("-j", "--jobs", type=int, help="nombre de ffmpeg lancés en parallèle")
+    parser.add_argument("--dry-run", action="store_true", help="afficher les commandes sans les lancer")
+    parser.add_argument("-q", "--quiet", action="store_true", help="ne pas afficher l'avancement")
+    args = parser.parse_args(argv)
+
+    options = dict(args.option)
+    if args.preset:
+        options["preset"] = args.preset
+
+    if args.resume:
+        return resume_jobs(max_workers=args.jobs, quiet=args.quiet)
+
+    if args.spec:
+        specs = load_specs(args.spec)
+        jobs = [(build_job(spec), spec["inputs"][0], spec["output"], job_cache_inputs(spec)) for spec in specs]
+    elif not (args.operation and args.input and args.output):
+        parser.error("il faut une opération, une entrée et une sortie (ou --spec)")
+    elif args.batch:
+        input_files = list_batch_inputs(args.input)
+        if not input_files:
+            parser.error(f"aucun fichier ne correspond à {args.input}")
+        nb_workers, threads = batch_parallelism(len(input_files), max_workers=args.jobs)
+        args.jobs = nb_workers
+        make_command = make_batch_command(args.operation, **normalize_options(options))
+        jobs = [(cmd, input_file, out, [input_file]) for cmd, input_file, out in
+                build_batch_jobs(input_files, args.output, args.ext, make_command, args.threads or threads)]
+    else:
+        if args.threads:
+            options["threads"] = args.threads
+        spec = {"operation": args.operation, "inputs": [args.input], "output": args.output, "options": options}
+        jobs = [(build_job(spec), args.input, args.output, job_cache_inputs(spec))]
+
+    if args.dry_run:
+        for cmd, *_ in jobs:
+            print(describe(cmd))
+            if isinstance(cmd, JobPlan):
+                cmd.cleanup()
+        return 0
+
+    return run_jobs(jobs, max_workers=args.jobs, quiet=args.quiet)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+class FilterGraph:
+    """
+    Graphe de filtres pour -filter_complex : une suite de chaînes "[entrées]filtre1,filtre2[sorties]"
+    séparées par des ";".
+    """
+    def __init__(self):
+        self.chains = []
+
+
+    def add(self, inputs: list, filters: list, outputs: list) -> None:
+        """ Ajoute une chaîne, ex : add(["0:v"], ["split=2"], ["a", "b"]) -> "[0:v]split=2[a][b]" """
+        labels_in = "".join(f"[{label}]" for label in inputs)
+        labels_out = "".join(f"[{label}]" for label in outputs)
+        self.chains.append(f"{labels_in}{','.join(filters)}{labels_out}")
+
+
+    def __str__(self) -> str:
+        return ";".join(self.chains)
+
+
+class FfmpegCommand:
+    """
+    Commande ffmpeg construite par morceaux (entrées, sorties, options par flux, filtres)
+    puis compilée en liste d'arguments pour subprocess : les chemins n'ont jamais besoin d'être échappés.
+    """
+    def __init__(self, *global_options: str):
+        self.global_options = list(global_options)
+        self.inputs = []   # (options, chemin)
+        self.outputs = []  # (options, chemin)
+        self.video_filters = []
+        self.audio_filters = []
+        self.filter_graph = None
+
+
+    def add_input(self, path: str, *options) -> int:
+        """ Ajoute une entrée précédée de ses options (-ss, -f...) ; renvoie son numéro """
+        self.inputs.append(([str(option) for option in options], str(path)))
+        return len(self.inputs) - 1
+
+
+    def add_output(self, path: str, *options) -> "FfmpegCommand":
+        self.outputs.append(([str(option) for option in options], str(path)))
+        return self
+
+
+    def add_video_filter(self, *filters: str) -> "FfmpegCommand":
+        """ Ajoute des filtres à la chaîne -vf, appliqués dans l'ordre d'ajout """
+        self.video_filters.extend(flt for flt in filters if flt)
+        return self
+
+
+    def add_audio_filter(self, *filters: str) -> "FfmpegCommand":
+        self.audio_filters.extend(flt for flt in filters if flt)
+        return self
+
+
+    def set_filter_graph(self, filter_graph: FilterGraph) -> "FfmpegCommand":
+        self.filter_graph = filter_graph
+        return self
+
+
+    def argv(self) -> list:
+        argv = ["ffmpeg"] + self.global_options
+        for options, path in self.inputs:
+            argv += options + ["-i", path]
+        if self.filter_graph is not None:
+            argv += ["-filter_complex", str(self.filter_graph)]
+        if self.video_filters:
+            argv += ["-vf", ",".join(self.video_filters)]
+        if self.audio_filters:
+            argv += ["-af", ",".join(self.audio_filters)]
+        for options, path in self.outputs:
+            argv += options + [path]
+        return argv
+
+
+def concat_list_line(path: str) -> str:
+    """ Ligne "file '...'" d'une liste pour le démuxeur concat (les apostrophes sont échappées) """
+    return "file '" + str(path).replace("'", "'\\''") + "'\n"
@@ -0,0 +1,309 @@
+"""
+Images décodées par ffmpeg sous forme de tableaux NumPy (rawvideo sur un pipe, sans fichiers images), ex :
+
+    with FrameReader("film.mp4", start=60, step=25, width=320) as reader:
+        for frame in reader:          # tableau (hauteur, largeur, 3) en uint8
+            print(reader.position, frame.mean())
+
+    with FrameWriter("rendu.mp4", 1280, 720, framerate="30", quality="20") as writer:
+        for frame in generated_frames:
+            writer.write(frame)
+
+NumPy est nécessaire pour ce module uniquement (pip install numpy).
+"""
+import os.path
+import subprocess
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ffmpeg_command import FfmpegCommand
+from ffmpeg_presets import EncoderPreset
+from ffmpeg_probe import probe
+from ffmpeg_supported_ext import dic_muxer_default_encoders
+
+# Nombre d'images envoyées à ffmpeg en une seule écriture
+FRAME_WRITER_BATCH = 32
+
+# Formats de pixels gérés : (type des valeurs, nb de valeurs par pixel)
+# yuv420p est renvoyé en un seul plan (hauteur * 3/2, largeur) : Y, puis U et V sous-échantillonnés
+dic_pix_fmt_layouts = {"rgb24": ("uint8", 3), "bgr24": ("uint8", 3), "rgba": ("uint8", 4),
+                       "gray": ("uint8", 1), "gray16le": ("uint16", 1), "yuv420p": ("uint8", 1)}
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy est nécessaire pour lire ou écrire des images brutes : pip install numpy")
+
+
+def frame_shape(width: int, height: int, pix_fmt: str) -> tuple:
+    """ Forme du tableau d'une image """
+    _, nb_values = dic_pix_fmt_layouts[pix_fmt]
+    if pix_fmt == "yuv420p":
+        return (height * 3 // 2, width)
+    return (height, width) if nb_values == 1 else (height, width, nb_values)
+
+
+class FrameReader:
+    """
+    Lit les images d'une vidéo, décodées par ffmpeg en rawvideo.
+    Chaque image est une vue sur un tampon réutilisé (aucune copie) : elle est écrasée par la lecture
+    de la suivante, frame.copy() pour la conserver.
+    start/end : intervalle lu (s) ; step : une image sur step ; fps : cadence imposée ;
+    width/height : réduction faite par ffmpeg (un seul des deux garde les proportions)
+    """
+    def __init__(self, input_path: str, pix_fmt: str = "rgb24", start: float = None, end: float = None,
+                 step: int = 1, fps: float = None, width: int = None, height: int = None, threads: int = None):
+        require_numpy()
+        if pix_fmt not in dic_pix_fmt_layouts:
+            raise ValueError(f"Format de pixels non géré : {pix_fmt}")
+        self.input_path = input_path
+        self.pix_fmt = pix_fmt
+        self.start = start or 0.0
+        self.end = end
+        self.step = max(1, int(step))
+        self.threads = threads
+
+        info = probe(input_path)
+        if not info.has_video:
+            raise ValueError(f"Pas de flux vidéo dans {input_path}")
+        self.fps = fps
+        self.source_fps = fps or info.frame_rate
+        self.width, self.height = self.output_size(info.width, info.height, width, height)
+
+        dtype, _ = dic_pix_fmt_layouts[pix_fmt]
+        self.shape = frame_shape(self.width, self.height, pix_fmt)
+        self.buffer = np.empty(self.shape, dtype=dtype)
+        self.buffer_bytes = memoryview(self.buffer).cast("B")
+
+        self.process = None
+        self.position = None  # instant (s) de la dernière image lue
+        self.nb_frames_read = 0
+
+
+    @staticmethod
+    def output_size(source_width: int, source_height: int, width: int = None, height: int = None) -> tuple:
+        """ Taille de sortie (toujours paire, pour les formats sous-échantillonnés) """
+        if width and not height:
+            height = source_height * width / source_width
+        elif height and not width:
+            width = source_width * height / source_height
+        elif not width:
+            width, height = source_width, source_height
+        return 2 * max(1, round(width / 2)), 2 * max(1, round(height / 2))
+
+
+    def command(self) -> list:
+        cmd_command = FfmpegCommand("-nostdin", "-v", "error")
+        input_options = ["-ss", f"{self.start:.6f}"] if self.start else []
+        cmd_command.add_input(self.input_path, *input_options)
+
+        video_filters = []
+        if self.fps:
+            video_filters.append(f"fps={self.fps}")
+        if self.step > 1:
+            video_filters.append(f"select=not(mod(n\\,{self.step}))")
+        video_filters.append(f"scale={self.width}:{self.height}:flags=area")
+        cmd_command.add_video_filter(*video_filters)
+
+        output_options = ["-t", f"{self.end - self.start:.6f}"] if self.end is not None else []
+        if self.threads:
+            output_options += ["-threads", self.threads]
+        cmd_command.add_output("pipe:1", *output_options, "-an", "-sn", "-vsync", "passthrough",
+                               "-f", "rawvideo", "-pix_fmt", self.pix_fmt)
+        return cmd_command.argv()
+
+
+    def read(self):
+        """ Image suivante (vue sur le tampon partagé), None à la fin de la vidéo """
+        if self.process is None:
+            self.process = subprocess.Popen(self.command(), stdout=subprocess.PIPE, bufsize=0)
+            self.nb_frames_read = 0
+
+        received = 0
+        while received < len(self.buffer_bytes):
+            nb_bytes = self.process.stdout.readinto(self.buffer_bytes[received:])
+            if not nb_bytes:
+                self._finish(incomplete=received > 0)
+                return None
+            received += nb_bytes
+
+        if self.source_fps:
+            self.position = self.start + self.nb_frames_read * self.step / self.source_fps
+        self.nb_frames_read += 1
+        return self.buffer
+
+
+    def seek(self, t: float) -> None:
+        """ La prochaine image lue sera celle de l'instant t (ffmpeg est relancé à partir de là) """
+        self.close()
+        self.start = t
+
+
+    def frame_at(self, t: float):
+        """ Image à l'instant t (vue sur le tampon partagé) """
+        self.seek(t)
+        return self.read()
+
+
+    def _finish(self, incomplete: bool = False) -> None:
+        process, self.process = self.process, None
+        process.stdout.close()
+        returncode = process.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, process.args)
+        if incomplete:
+            raise ValueError("Dernière image incomplète : format de sortie inattendu")
+
+
+    def close(self) -> None:
+        """ Arrête ffmpeg s'il n'a pas fini de décoder """
+        if self.process is not None:
+            self.process.kill()
+            self.process.stdout.close()
+            self.process.wait()
+            self.process = None
+
+
+    def __iter__(self):
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FrameWriter:
+    """
+    Encode en vidéo des images (tableaux NumPy ou octets bruts) envoyées à ffmpeg en rawvideo sur son
+    entrée standard, sans passer par des fichiers images. Mêmes réglages que FilesInput.concatenate_images
+    (framerate, quality = CRF), ou un EncoderPreset. Les images sont regroupées par lots de batch_frames
+    pour limiter le nombre d'écritures.
+    """
+    def __init__(self, output_path: str, width: int, height: int, framerate: str = "25", quality: str = "23",
+                 pix_fmt: str = "rgb24", preset: EncoderPreset = None, batch_frames: int = FRAME_WRITER_BATCH):
+        require_numpy()
+        if pix_fmt not in dic_pix_fmt_layouts:
+            raise ValueError(f"Format de pixels non géré : {pix_fmt}")
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.framerate = str(framerate)
+        self.quality = str(quality)
+        self.pix_fmt = pix_fmt
+        self.preset = preset
+
+        dtype, _ = dic_pix_fmt_layouts[pix_fmt]
+        self.shape = frame_shape(width, height, pix_fmt)
+        self.batch = np.empty((max(1, batch_frames),) + self.shape, dtype=dtype)
+        self.frame_bytes = self.batch[0].nbytes
+        self.nb_frames_batched = 0
+        self.process = None
+
+
+    def command(self) -> list:
+        cmd_command = FfmpegCommand("-v", "error")
+        cmd_command.add_input("pipe:0", "-f", "rawvideo", "-pix_fmt", self.pix_fmt,
+                              "-s", f"{self.width}x{self.height}", "-framerate", self.framerate)
+        if self.preset is not None:
+            output_ext = os.path.splitext(self.output_path)[1].lower()
+            encoder = dic_muxer_default_encoders.get(output_ext, {}).get("video", "libx264")
+            video_options = self.preset.video_options(encoder, output_ext)
+        else:
+            video_options = ["-c:v", "libx264", "-crf", self.quality]
+        cmd_command.add_output(self.output_path, *video_options, "-pix_fmt", "yuv420p")
+        return cmd_command.argv()
+
+
+    def write(self, frame) -> None:
+        """ Ajoute une image (tableau de forme self.shape, ou octets bruts de la même taille) """
+        if isinstance(frame, np.ndarray):
+            if frame.shape != self.shape:
+                raise ValueError(f"Image de forme {frame.shape}, {self.shape} attendue")
+            self.batch[self.nb_frames_batched] = frame
+        else:
+            data = memoryview(frame).cast("B")
+            if len(data) != self.frame_bytes:
+                raise ValueError(f"Image de {len(data)} octets, {self.frame_bytes} attendus")
+            memoryview(self.batch[self.nb_frames_batched]).cast("B")[:] = data
+
+        self.nb_frames_batched += 1
+        if self.nb_frames_batched == len(self.batch):
+            self.flush()
+
+
+    def write_frames(self, frames) -> None:
+        """ Ajoute plusieurs images ; un tableau (nb d'images,) + self.shape est envoyé d'un seul coup """
+        if isinstance(frames, np.ndarray) and frames.shape[1:] == self.shape and frames.dtype == self.batch.dtype:
+            self.flush()
+            self._send(memoryview(np.ascontiguousarray(frames)).cast("B"))
+            return
+        for frame in frames:
+            self.write(frame)
+
+
+    def flush(self) -> None:
+        """ Envoie à ffmpeg les images en attente """
+        nb_frames, self.nb_frames_batched = self.nb_frames_batched, 0
+        if nb_frames:
+            self._send(memoryview(self.batch[:nb_frames]).cast("B"))
+
+
+    def _send(self, data: memoryview) -> None:
+        if self.process is None:
+            self.process = subprocess.Popen(self.command(), stdin=subprocess.PIPE, bufsize=0)
+        try:
+            while data:  # une écriture sur un pipe peut être partielle
+                data = data[self.process.stdin.write(data):]
+        except BrokenPipeError:
+            self.close()  # ffmpeg s'est arrêté : lève CalledProcessError avec son code de retour
+            raise
+
+
+    def close(self) -> None:
+        """ Envoie les dernières images et attend la fin de l'encodage (CalledProcessError si ffmpeg échoue) """
+        try:
+            self.flush()
+        except BrokenPipeError:
+            pass
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = process.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, process.args)
+
+
+    def abort(self) -> None:
+        """ Arrête ffmpeg sans finir la vidéo """
+        self.nb_frames_batched = 0
+        process, self.process = self.process, None
+        if process is not None:
+            process.kill()
+            process.wait()
+            process.stdin.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
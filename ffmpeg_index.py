@@ -0,0 +1,157 @@
+import hashlib
+import mmap
+import os
+import struct
+import subprocess
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from ffmpeg_probe import CACHE_DIR, probe
+
+INDEX_DIR = CACHE_DIR / "index"
+
+# En-tête : magic, version, taille et date de modif du fichier indexé, nb de paquets, nb d'images clés
+# Suivent (tous alignés sur 8 octets) : pts des paquets (double), positions dans le fichier (int64),
+# pts des images clés (double), puis un octet de flags par paquet.
+# Les pts sont relatifs au début du fichier (start_time soustrait), comme les instants de -ss en entrée.
+INDEX_MAGIC = b"FPIX"
+INDEX_VERSION = 2
+INDEX_HEADER = struct.Struct("<4sIqqQQ")
+FLAG_KEYFRAME = 1
+
+
+def index_path_for(path: str) -> str:
+    """ Emplacement du fichier d'index d'une vidéo (dans le dossier de cache de l'application) """
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return str(INDEX_DIR / f"{digest}.idx")
+
+
+def build_index(path: str, index_path: str) -> None:
+    """ Lit une seule fois les paquets du 1er flux vidéo avec ffprobe (sans décoder) et écrit l'index binaire """
+    stat = os.stat(path)
+    start_time = probe(path).start_time
+    result = subprocess.run(["ffprobe", "-v", "error", "-select_streams", "v:0",
+                             "-show_entries", "packet=pts_time,pos,flags", "-of", "csv=print_section=0", path],
+                            capture_output=True, text=True, check=True)
+
+    packets = []
+    for line in result.stdout.splitlines():
+        fields = line.split(",")
+        if len(fields) < 3 or fields[0] in ("", "N/A"):
+            continue
+        pos = int(fields[1]) if fields[1].isdigit() else -1
+        packets.append((float(fields[0]) - start_time, pos, FLAG_KEYFRAME if "K" in fields[2] else 0))
+    packets.sort()  # les paquets sont lus dans l'ordre de décodage, pas de présentation
+
+    pts = array("d", (packet[0] for packet in packets))
+    positions = array("q", (packet[1] for packet in packets))
+    flags = array("B", (packet[2] for packet in packets))
+    keyframes = array("d", (packet[0] for packet in packets if packet[2] & FLAG_KEYFRAME))
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, stat.st_size, stat.st_mtime_ns,
+                                     len(pts), len(keyframes)))
+        for values in (pts, positions, keyframes, flags):
+            values.tofile(file)
+    os.replace(tmp_path, index_path)
+
+
+class PacketIndex:
+    """ Index des paquets d'une vidéo, projeté en mémoire (mmap) : les recherches se font par dichotomie """
+    def __init__(self, index_path: str):
+        with open(index_path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.mmap) < INDEX_HEADER.size:
+            self.mmap.close()
+            raise ValueError(f"Index tronqué : {index_path}")
+        magic, version, self.file_size, self.file_mtime_ns, nb_packets, nb_keyframes = \
+            INDEX_HEADER.unpack_from(self.mmap, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.mmap.close()
+            raise ValueError(f"Index invalide : {index_path}")
+        # un fichier plus court que ce qu'annonce l'en-tête (écriture interrompue) est à reconstruire
+        if len(self.mmap) < INDEX_HEADER.size + 8 * (2 * nb_packets + nb_keyframes) + nb_packets:
+            self.mmap.close()
+            raise ValueError(f"Index tronqué : {index_path}")
+
+        view = memoryview(self.mmap)
+        offset = INDEX_HEADER.size
+        self.pts = view[offset:offset + 8 * nb_packets].cast("d")
+        offset += 8 * nb_packets
+        self.positions = view[offset:offset + 8 * nb_packets].cast("q")
+        offset += 8 * nb_packets
+        self.keyframes = view[offset:offset + 8 * nb_keyframes].cast("d")
+        offset += 8 * nb_keyframes
+        self.flags = view[offset:offset + nb_packets]
+        view.release()
+
+
+    def matches(self, path: str) -> bool:
+        """ L'index correspond-il encore au fichier (même taille, même date de modification) ? """
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns) == (self.file_size, self.file_mtime_ns)
+
+
+    def keyframe_before(self, t: float):
+        """ Dernière image clé à l'instant t ou avant (None s'il n'y en a pas) """
+        idx = bisect_right(self.keyframes, t)
+        return self.keyframes[idx - 1] if idx else None
+
+
+    def keyframe_after(self, t: float):
+        """ Première image clé à l'instant t ou après (None s'il n'y en a pas) """
+        idx = bisect_left(self.keyframes, t)
+        return self.keyframes[idx] if idx < len(self.keyframes) else None
+
+
+    def keyframes_between(self, begin: float, end: float) -> list:
+        return self.keyframes[bisect_left(self.keyframes, begin):bisect_right(self.keyframes, end)].tolist()
+
+
+    def packet_at(self, t: float):
+        """ (pts, position en octets) du dernier paquet présenté à l'instant t ou avant """
+        idx = bisect_right(self.pts, t)
+        return (self.pts[idx - 1], self.positions[idx - 1]) if idx else None
+
+
+    def close(self) -> None:
+        for view in (self.pts, self.positions, self.keyframes, self.flags):
+            view.release()
+        self.mmap.close()
+
+
+_open_indexes = {}
+_open_indexes_lock = threading.Lock()
+
+
+def get_index(path: str) -> PacketIndex:
+    """ Index de la vidéo : construit au premier appel (ou si le fichier a changé), puis réutilisé """
+    index_path = index_path_for(path)
+    with _open_indexes_lock:
+        index = _open_indexes.get(index_path)
+        if index is not None and index.matches(path):
+            return index
+        if index is not None:
+            index.close()
+            del _open_indexes[index_path]
+
+        index = None
+        if os.path.exists(index_path):
+            try:
+                index = PacketIndex(index_path)
+            except (ValueError, struct.error):
+                index = None
+            if index is not None and not index.matches(path):
+                index.close()
+                index = None
+
+        if index is None:
+            build_index(path, index_path)
+            index = PacketIndex(index_path)
+
+        _open_indexes[index_path] = index
+        return index
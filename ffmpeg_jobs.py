@@ -0,0 +1,187 @@
+import contextlib
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ffmpeg_cache import detach_output, output_cache
+from ffmpeg_probe import probe_duration
+from ffmpeg_progress import JobProgress, parse_progress_blocks, with_progress_args
+
+
+def default_max_workers() -> int:
+    """ Nombre de jobs ffmpeg lancés en parallèle par défaut (ffmpeg est lui-même multi-threadé) """
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+class JobPlan:
+    """
+    Job composé de plusieurs étapes exécutées l'une après l'autre ;
+    les commandes d'une même étape sont indépendantes et tournent en parallèle.
+    Le dossier temporaire (morceaux intermédiaires, listes de concaténation) est supprimé à la fin.
+    on_success : fonction sans argument appelée une fois toutes les étapes réussies (ménage des anciens fichiers)
+    """
+    def __init__(self, steps: list, temp_dir: str = None, on_success=None):
+        self.steps = steps
+        self.temp_dir = temp_dir
+        self.on_success = on_success
+
+
+    def cleanup(self) -> None:
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def run_plan(plan: JobPlan, on_progress=None, duration: float = None, input_path: str = None,
+             slots: threading.Semaphore = None) -> None:
+    """
+    Exécute un JobPlan ; l'avancement n'est suivi que pour les étapes d'une seule commande.
+    slots : places partagées avec les autres jobs (voir run_command), qui bornent le nombre de ffmpeg
+    d'une étape lancés en même temps
+    """
+    try:
+        for step in plan.steps:
+            if len(step) == 1:
+                run_command(step[0], on_progress, duration, input_path, slots)
+                continue
+            with ThreadPoolExecutor(max_workers=min(len(step), os.cpu_count() or 1)) as pool:
+                futures = [pool.submit(run_command, cmd, slots=slots) for cmd in step]
+            for future in futures:
+                future.result()  # relance la première erreur
+        if plan.on_success is not None:
+            plan.on_success()
+    finally:
+        plan.cleanup()
+
+
+def run_command(cmd, on_progress=None, duration: float = None, input_path: str = None,
+                slots: threading.Semaphore = None) -> None:
+    """
+    Lance une commande ffmpeg (ou un JobPlan) et attend sa fin (lève CalledProcessError en cas d'échec).
+    Si on_progress est donné, il reçoit un JobProgress à chaque bloc de -progress ;
+    la durée attendue sert au pourcentage et à l'ETA (par défaut celle de input_path).
+    slots : sémaphore dont chaque ffmpeg prend une place le temps de son exécution
+    """
+    if isinstance(cmd, JobPlan):
+        run_plan(cmd, on_progress, duration, input_path, slots)
+        return
+
+    if duration is None and input_path is not None and on_progress is not None:
+        duration = probe_duration(input_path)
+
+    with slots if slots is not None else contextlib.nullcontext():
+        _run_process(cmd, on_progress, duration)
+
+
+def _run_process(cmd: list, on_progress, duration: float) -> None:
+    if on_progress is None:
+        subprocess.run(cmd, check=True)
+        return
+
+    with subprocess.Popen(with_progress_args(cmd), stdout=subprocess.PIPE, text=True,
+                          encoding="utf-8", errors="replace") as process:
+        for block in parse_progress_blocks(process.stdout):
+            on_progress(JobProgress(block, duration))
+
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd)
+
+
+def run_cached(cmd, out, cache_inputs: list, on_progress=None, duration: float = None,
+               input_path: str = None, slots: threading.Semaphore = None) -> None:
+    """
+    run_command, en réutilisant le résultat d'une commande identique sur les mêmes entrées (cache_inputs)
+    s'il est dans le cache de sorties ; sinon le fichier produit y est ajouté
+    """
+    key = output_cache.key(cmd, cache_inputs, out)
+    if key is not None and output_cache.fetch(key, out):
+        if isinstance(cmd, JobPlan):
+            cmd.cleanup()
+        return
+
+    detach_output(out)
+    run_command(cmd, on_progress, duration, input_path, slots)
+    if key is not None:
+        output_cache.store(key, out)
+
+
+class JobExecutor:
+    """
+    Pool de taille bornée qui exécute les commandes ffmpeg en arrière-plan.
+    Les ffmpeg des étapes parallèles d'un JobPlan se partagent les mêmes max_workers places que les jobs :
+    il n'y a jamais plus de max_workers ffmpeg à la fois.
+    Les threads du pool ne touchent jamais à Tk : fins de jobs et avancements sont déposés dans une file,
+    que le thread principal vide avec poll() (appelée régulièrement via fen.after).
+    """
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or default_max_workers()
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ffmpeg")
+        self.slots = threading.Semaphore(self.max_workers)
+        self.events = queue.Queue()
+        self.nb_jobs_running = 0
+
+
+    def submit(self, cmd, out, on_success=None, on_error=None, on_progress=None,
+               input_path: str = None, duration: float = None, cache_inputs: list = None):
+        """
+        Ajoute un job au pool (à appeler depuis le thread principal).
+        cmd : commande, JobPlan, ou fonction sans argument qui les construit (elle est alors appelée dans
+        le thread du pool : les analyses ffprobe ne bloquent pas l'interface, et ses erreurs vont à on_error).
+        on_success(out), on_error(out, erreur) et on_progress(out, JobProgress) sont appelés par poll().
+        cache_inputs : fichiers d'entrée du job, pour réutiliser le résultat en cache (voir run_cached)
+        """
+        post_progress = None
+        if on_progress is not None:
+            post_progress = lambda progress: self.events.put(("progress", on_progress, out, progress))
+
+        self.nb_jobs_running += 1
+        future = self.pool.submit(self._run, cmd, out, cache_inputs, post_progress, duration, input_path)
+        future.add_done_callback(lambda f: self.events.put(("done", f, out, on_success, on_error)))
+        return future
+
+
+    def _run(self, cmd, out, cache_inputs, on_progress, duration, input_path) -> None:
+        if callable(cmd):
+            cmd = cmd()
+        if cache_inputs:
+            run_cached(cmd, out, cache_inputs, on_progress, duration, input_path, self.slots)
+        else:
+            run_command(cmd, on_progress, duration, input_path, self.slots)
+
+
+    def poll(self) -> None:
+        """ Exécute, dans le thread appelant, les callbacks des événements reçus depuis le dernier appel """
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return
+            self._handle_event(event)
+
+
+    def join(self) -> None:
+        """ Bloque jusqu'à la fin de tous les jobs soumis (utilisation sans interface) """
+        while self.nb_jobs_running:
+            self._handle_event(self.events.get())
+
+
+    def _handle_event(self, event: tuple) -> None:
+        if event[0] == "progress":
+            _, on_progress, out, progress = event
+            on_progress(out, progress)
+            return
+
+        _, future, out, on_success, on_error = event
+        self.nb_jobs_running -= 1
+        error = future.exception()
+        if error is None:
+            if on_success is not None:
+                on_success(out)
+        elif on_error is not None:
+            on_error(out, error)
+
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.pool.shutdown(wait=wait, cancel_futures=not wait)
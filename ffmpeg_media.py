@@ -0,0 +1,1014 @@
+import asyncio
+import glob
+import hashlib
+import json
+import math
+import os.path
+import re
+import subprocess
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from ffmpeg_async import run_async
+from ffmpeg_cache import normalize_argv
+from ffmpeg_capabilities import dic_ext_formats, get_capabilities
+from ffmpeg_command import FfmpegCommand, FilterGraph, concat_list_line
+from ffmpeg_index import PacketIndex, get_index
+from ffmpeg_jobs import JobPlan, default_max_workers
+from ffmpeg_presets import EncoderPreset, bitrate_to_kbps, dic_ladder_bitrates, dic_presets
+from ffmpeg_probe import MediaInfo, file_fingerprint, probe
+from ffmpeg_supported_ext import dic_muxer_codecs, dic_muxer_default_encoders, list_text_subtitle_codecs, \
+    dic_remux_bsf_annexb, list_annexb_muxers, list_adts_demuxers, list_asc_muxers, dic_codec_encoders, \
+    list_video_exts
+
+# En dessous de cette durée (en s) par morceau, découper une vidéo pour l'encoder en parallèle ne paie pas
+MIN_CHUNK_DURATION = 30
+
+# En dessous de ce nombre d'images par morceau, encoder une séquence d'images en parallèle ne paie pas
+MIN_CHUNK_FRAMES = 250
+
+# Intervalle (en s) des images clés forcées des qualités HLS/DASH : les segments en sont des multiples
+STREAMING_KEYFRAME_INTERVAL = 2
+
+# Codecs dont les paramètres (SPS/PPS) sont répétés dans le flux en mpegts : des morceaux encodés
+# différemment s'y recollent sans réencodage
+list_ts_codecs = ["h264", "hevc", "mpeg2video"]
+
+# Conteneurs dont l'index est écrit à la fin : il faut les fragmenter pour les écrire dans un pipe
+list_fragmented_muxers = ["mp4", "mov", "m4a", "ipod", "3gp", "3g2"]
+
+
+def hms_to_seconds(hms: str) -> int:
+    """ "hh:mm:ss" -> nombre de secondes """
+    return int(hms[0:2]) * 3600 + int(hms[3:5]) * 60 + int(hms[6:8])
+
+
+def is_pipe(path) -> bool:
+    """ "pipe:0", "pipe:1"... : entrée ou sortie standard de ffmpeg plutôt qu'un fichier """
+    return str(path).startswith("pipe:")
+
+
+class MediaObject:
+    def __init__(self, input_path, output_path, threads: int = None, input_format: str = None,
+                 output_format: str = None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.threads = threads  # valeur de -threads (None : choix automatique de ffmpeg)
+        # formats (-f) des entrées/sorties sans extension, comme les pipes (voir ffmpeg_pipe)
+        self.input_format = input_format
+        self.output_format = output_format
+
+
+    def threads_option(self) -> list:
+        return ["-threads", str(self.threads)] if self.threads else []
+
+
+    def input_options(self) -> list:
+        return ["-f", self.input_format] if self.input_format else []
+
+
+    def output_format_options(self) -> list:
+        if not self.output_format:
+            return []
+        if is_pipe(self.output_path) and self.output_format in list_fragmented_muxers:
+            return ["-f", self.output_format, "-movflags", "frag_keyframe+empty_moov"]
+        return ["-f", self.output_format]
+
+
+    def new_command(self, *output_options) -> FfmpegCommand:
+        """ Commande de base : le fichier d'entrée, puis celui de sortie précédé de ses options """
+        cmd_command = FfmpegCommand()
+        cmd_command.add_input(self.input_path, *self.input_options())
+        cmd_command.add_output(self.output_path, *output_options, *self.threads_option(),
+                               *self.output_format_options())
+        return cmd_command
+
+
+    def index(self) -> PacketIndex:
+        """ Index des paquets/images clés de l'entrée (construit une fois, puis relu par mmap) """
+        if is_pipe(self.input_path):
+            raise ValueError("Une entrée en flux ne peut pas être indexée")
+        return get_index(self.input_path)
+
+
+    def probe(self) -> MediaInfo:
+        """ Codecs, durée, résolution... du fichier d'entrée (mis en cache sur le disque) """
+        if is_pipe(self.input_path):
+            raise ValueError("Une entrée en flux ne peut pas être analysée à l'avance")
+        return probe(self.input_path)
+
+
+    def output_ext(self) -> str:
+        """ Extension de la sortie (".mp4"...), ou "." + format pour une sortie au format imposé """
+        if self.output_format:
+            return "." + self.output_format
+        return os.path.splitext(self.output_path)[1].lower()
+
+
+    def output_encoders(self) -> dict:
+        """
+        Encodeurs par défaut du conteneur de sortie ({} s'il est inconnu), remplacés par un encodeur
+        du même codec quand ffmpeg n'a pas été compilé avec (ex : libopenh264 au lieu de libx264)
+        """
+        capabilities = get_capabilities()
+        return {stream_type: capabilities.best_encoder(encoder) or encoder
+                for stream_type, encoder in dic_muxer_default_encoders.get(self.output_ext(), {}).items()}
+
+
+    def compress(self, chunks: int = None, preset: EncoderPreset = None):
+        """
+        Compression du fichier
+        chunks : nb de morceaux encodés en parallèle, pour les longues vidéos
+        preset : réglages d'encodage (sans preset, ceux par défaut de ffmpeg)
+        """
+        if chunks and chunks > 1:
+            plan = self.chunked_compress(chunks, preset)
+            if plan is not None:
+                return plan
+
+        preset_options = preset.options(self.output_encoders(), self.output_ext()) if preset else []
+        cmd_command = self.new_command(*preset_options)
+        return cmd_command.argv()
+
+
+    def chunked_compress(self, chunks: int, preset: EncoderPreset = None):
+        """
+        Découpe la vidéo aux images clés en morceaux de durées proches, les encode en parallèle
+        avec les mêmes réglages (l'audio en même temps, à part) puis les recolle sans réencodage.
+        Renvoie un JobPlan, ou None si la vidéo est trop courte ou ne peut pas être analysée.
+        """
+        try:
+            info = self.probe()
+            if not info.has_video or not info.duration:
+                return None
+            index = self.index()
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            return None
+
+        nb_chunks = min(chunks, int(info.duration // MIN_CHUNK_DURATION))
+        boundaries = [0.0]
+        for idx in range(1, nb_chunks):
+            keyframe = index.keyframe_before(idx * info.duration / nb_chunks)
+            if keyframe is not None and keyframe > boundaries[-1]:
+                boundaries.append(keyframe)
+        if len(boundaries) < 2:
+            return None
+        boundaries.append(None)  # le dernier morceau va jusqu'à la fin
+
+        encoders = self.output_encoders()
+        video_options = preset.video_options(encoders.get("video", "libx264"), self.output_ext()) if preset \
+            else ["-c:v", encoders.get("video", "libx264")]
+        audio_options = preset.audio_options(encoders.get("audio", "aac")) if preset \
+            else ["-c:a", encoders.get("audio", "aac")]
+        threads = max(1, (os.cpu_count() or 1) // (len(boundaries) - 1))
+
+        temp_dir = tempfile.mkdtemp(prefix="ffmpeg_python_chunks_")
+        list_path = os.path.join(temp_dir, "chunks.txt")
+        chunk_commands = []
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for idx, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+                chunk_path = os.path.join(temp_dir, f"chunk{idx}.mkv")
+                list_file.write(concat_list_line(os.path.basename(chunk_path)))
+                duration_option = ["-t", f"{end - start:.6f}"] if end is not None else []
+
+                chunk_command = FfmpegCommand()
+                chunk_command.add_input(self.input_path, "-ss", f"{start:.6f}")
+                chunk_command.add_output(chunk_path, *duration_option, "-an", "-sn", *video_options,
+                                         "-threads", threads)
+                chunk_commands.append(chunk_command.argv())
+
+        audio_path = None
+        if info.has_audio:
+            audio_path = os.path.join(temp_dir, "audio.mka")
+            audio_command = FfmpegCommand()
+            audio_command.add_input(self.input_path)
+            audio_command.add_output(audio_path, "-vn", "-sn", *audio_options)
+            chunk_commands.append(audio_command.argv())
+
+        concat_command = FilesInput(input_path=list_path, output_path=self.output_path)\
+            .concatenate_videos(audio_path=audio_path, validate=False)
+
+        return JobPlan([chunk_commands, [concat_command]], temp_dir=temp_dir)
+
+
+    def convert(self, lossy: bool, preset: EncoderPreset = None) -> list:
+        """
+        Conversion (voire compression) du fichier.
+        Sans lossy, chaque flux est copié tel quel si le conteneur de sortie l'accepte, réencodé sinon.
+        preset : réglages des flux réencodés
+        """
+        encoders = self.output_encoders()
+        output_ext = self.output_ext()
+        preset_options = preset.options(encoders, output_ext) if preset else []
+        if lossy:
+            cmd_command = self.new_command(*preset_options)
+            return cmd_command.argv()
+
+        try:
+            decisions = self.stream_decisions(output_ext)
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            # ffprobe indisponible : on laisse ffmpeg choisir les encodeurs du conteneur
+            cmd_command = self.new_command(*preset_options)
+            return cmd_command.argv()
+
+        stream_options = []
+        for stream_type, (decision, bsf) in decisions.items():
+            letter = stream_type[0]  # v, a ou s
+            if decision in ("copy", "remux"):
+                stream_options += [f"-c:{letter}", "copy"]
+                if bsf:
+                    stream_options += [f"-bsf:{letter}", bsf]
+            elif decision == "drop":
+                stream_options.append(f"-{letter}n")
+            elif preset and stream_type == "video":
+                stream_options += preset.video_options(encoders.get("video", "libx264"), output_ext)
+            elif preset and stream_type == "audio":
+                stream_options += preset.audio_options(encoders.get("audio", "aac"))
+            elif stream_type in encoders:
+                stream_options += [f"-c:{letter}", encoders[stream_type]]
+
+        cmd_command = self.new_command(*stream_options)
+        return cmd_command.argv()
+
+
+    def stream_decisions(self, output_ext: str) -> dict:
+        """
+        Pour chaque type de flux de l'entrée : (décision, filtre de bitstream), la décision étant
+        "copy", "remux" (copie avec filtre de bitstream), "transcode" ou "drop" (flux impossible à convertir)
+        """
+        info = self.probe()
+        source_formats = info.format_name.split(",")
+        accepted_codecs = dic_muxer_codecs.get(output_ext, {})  # conteneur inconnu : on réencode tout
+
+        decisions = {}
+        for stream_type, codec in [("video", info.video_codec), ("audio", info.audio_codec),
+                                   ("subtitle", info.subtitle_codec)]:
+            if codec is None:
+                continue
+
+            if accepted_codecs is None or codec in accepted_codecs.get(stream_type, ()):
+                bsf = None
+                if stream_type == "video" and codec in dic_remux_bsf_annexb and output_ext in list_annexb_muxers \
+                        and not {"mpegts", "h264", "hevc"} & set(source_formats):
+                    bsf = dic_remux_bsf_annexb[codec]
+                elif stream_type == "audio" and codec == "aac" and output_ext in list_asc_muxers \
+                        and set(list_adts_demuxers) & set(source_formats):
+                    bsf = "aac_adtstoasc"
+                decisions[stream_type] = ("remux" if bsf else "copy", bsf)
+
+            elif stream_type == "subtitle" and (codec not in list_text_subtitle_codecs
+                                                or "subtitle" not in dic_muxer_default_encoders.get(output_ext, {})):
+                # les sous-titres image ne peuvent pas devenir du texte
+                decisions[stream_type] = ("drop", None)
+            else:
+                decisions[stream_type] = ("transcode", None)
+
+        return decisions
+
+
+    def extract_image(self):
+        """ Extraction de la piste image """
+        cmd_command = self.new_command("-an", "-c:v", "copy")
+        return cmd_command.argv()
+
+
+    def extract_audio(self):
+        """ Extraction de la piste audio """
+        cmd_command = self.new_command("-vn", "-c:a", "copy")
+        return cmd_command.argv()
+
+
+    def transform(self, *video_filters: str, preset: EncoderPreset = None) -> list:
+        """
+        Applique plusieurs filtres vidéo et l'encodage en une seule passe (un seul décodage/encodage), ex :
+        media.transform(media.crop_filter("640", "480"), media.rotate_filter("right"), preset=dic_presets["standard"])
+        """
+        preset_options = preset.options(self.output_encoders(), self.output_ext()) if preset else []
+        cmd_command = self.new_command(*preset_options)
+        cmd_command.add_video_filter(*video_filters)
+        return cmd_command.argv()
+
+
+    @staticmethod
+    def rotate_filter(rotation: str) -> str:
+        dic_rotations = {"right": "transpose=1",
+                        "left": "transpose=2",
+                        "180": "transpose=2,transpose=2",
+                        "haut-bas": "vflip",
+                        "gauche-droite": "hflip"}
+        return dic_rotations[rotation]
+
+
+    @staticmethod
+    def crop_filter(width: str, height: str, x: str="0", y: str="0") -> str:
+        return f"crop={width}:{height}:{x}:{y}"
+
+
+    def rotate(self, rotation: str = None):
+        """ Rotation de l'image """
+        return self.transform(self.rotate_filter(rotation))
+
+
+    def cut_duration(self, begin: str, end: str, smart: bool = False): # ex : 05h20m05s
+        """ Cut de la durée excédente (smart : coupe à l'image près, seuls les bords sont réencodés) """
+        if smart:
+            plan = self.smart_cut(hms_to_seconds(begin), hms_to_seconds(end))
+            if plan is not None:
+                return plan
+
+        duration_s = hms_to_seconds(end) - hms_to_seconds(begin)
+        duration_h = duration_s // 3600
+        duration_s %= 3600
+        duration_m = duration_s // 60
+        duration_s %= 60
+
+        duration = f"{duration_h:02}:{duration_m:02}:{duration_s:02}"
+        cmd_command = FfmpegCommand()
+        cmd_command.add_input(self.input_path, *self.input_options(), "-ss", begin)
+        cmd_command.add_output(self.output_path, "-t", duration, "-c", "copy", *self.threads_option(),
+                               *self.output_format_options())
+
+        return cmd_command.argv()
+
+
+    def smart_cut(self, begin_s: float, end_s: float):
+        """
+        Coupe à l'image près : les morceaux entre le début et la 1ère image clé, et entre la dernière image clé
+        et la fin, sont réencodés ; le milieu est copié tel quel. Renvoie un JobPlan, ou None si la vidéo
+        ne s'y prête pas (pas de flux vidéo, codec sans encodeur connu, ffprobe indisponible).
+        """
+        try:
+            info = self.probe()
+            if not info.has_video:
+                return None
+            index = self.index()
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            return None
+
+        encoder = get_capabilities().best_encoder(dic_codec_encoders.get(info.video_codec), info.video_codec)
+        if encoder is None:
+            return None
+
+        # Découpage en morceaux (début, fin, copie possible)
+        first_keyframe = index.keyframe_after(begin_s)
+        if first_keyframe is None or first_keyframe >= end_s:
+            pieces = [(begin_s, end_s, False)]
+        else:
+            last_keyframe = index.keyframe_before(end_s)
+            pieces = []
+            if begin_s < first_keyframe:
+                pieces.append((begin_s, first_keyframe, False))
+            if first_keyframe < last_keyframe:
+                pieces.append((first_keyframe, last_keyframe, True))
+            if last_keyframe < end_s:
+                pieces.append((last_keyframe, end_s, False))
+
+        # le mpegts garde les paramètres du codec dans le flux : les morceaux se recollent sans souci
+        piece_ext = ".ts" if info.video_codec in list_ts_codecs else ".mkv"
+        encode_options = ["-c:v", encoder]
+        if encoder in ("libx264", "libx265"):
+            encode_options += ["-crf", "18"]
+        if info.pix_fmt:
+            encode_options += ["-pix_fmt", info.pix_fmt]
+
+        temp_dir = tempfile.mkdtemp(prefix="ffmpeg_python_cut_")
+        list_path = os.path.join(temp_dir, "pieces.txt")
+        piece_commands = []
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for idx, (start, end, copy) in enumerate(pieces):
+                piece_path = os.path.join(temp_dir, f"piece{idx}{piece_ext}")
+                list_file.write(concat_list_line(os.path.basename(piece_path)))
+                options = ["-c:v", "copy"] if copy else encode_options
+
+                piece_command = FfmpegCommand()
+                piece_command.add_input(self.input_path, "-ss", f"{start:.6f}")
+                piece_command.add_output(piece_path, "-t", f"{end - start:.6f}", "-an", "-sn", *options,
+                                         *self.threads_option())
+                piece_commands.append(piece_command.argv())
+
+        # Les morceaux vidéo recollés + l'audio d'origine, copié sur la même plage
+        concat_command = FfmpegCommand()
+        concat_command.add_input(list_path, "-f", "concat", "-safe", "0")
+        concat_command.add_input(self.input_path, "-ss", f"{begin_s:.6f}", "-t", f"{end_s - begin_s:.6f}")
+        concat_command.add_output(self.output_path, "-map", "0:v", "-map", "1:a?", "-c", "copy")
+
+        return JobPlan([piece_commands, [concat_command.argv()]], temp_dir=temp_dir)
+
+
+    def crop(self, width: str, height: str, x: str="0", y: str="0"):
+        """ Rognage de la vidéo """
+        return self.transform(self.crop_filter(width, height, x, y))
+
+
+    def ladder_outputs(self, heights: list, audio_only: bool = False) -> list:
+        """
+        Fichiers produits par ladder : "film_1080p.mp4", "film_720p.mp4"...
+        (et "film_audio.m4a", seulement si l'entrée a du son)
+        """
+        stem, ext = os.path.splitext(self.output_path)
+        outputs = [f"{stem}_{height}p{ext}" for height in heights]
+        if audio_only and (is_pipe(self.input_path) or self.probe().has_audio):
+            outputs.append(f"{stem}_audio.m4a")
+        return outputs
+
+
+    def ladder(self, heights: list = (1080, 720, 480), bitrates: list = None, preset: EncoderPreset = None,
+               audio_only: bool = False) -> list:
+        """
+        Plusieurs qualités de la même vidéo en un seul ffmpeg : l'entrée est décodée une seule fois,
+        puis dupliquée (split) et redimensionnée pour chaque sortie (sans jamais agrandir la source).
+        bitrates : débit vidéo de chaque hauteur (sinon la qualité du preset)
+        audio_only : produit en plus un fichier audio seul (ignoré si l'entrée n'a pas de son)
+        """
+        outputs = self.ladder_outputs(heights, audio_only)
+        nb_videos = len(heights)
+
+        filter_graph = FilterGraph()
+        labels = [f"v{idx}" for idx in range(nb_videos)]
+        if nb_videos > 1:
+            filter_graph.add(["0:v"], [f"split={nb_videos}"], labels)
+        for idx, height in enumerate(heights):
+            filter_graph.add([labels[idx] if nb_videos > 1 else "0:v"], [f"scale=-2:min({height}\\,ih)"],
+                             [f"out{idx}"])
+
+        encoders = self.output_encoders()
+        cmd_command = FfmpegCommand()
+        cmd_command.add_input(self.input_path, *self.input_options())
+        cmd_command.set_filter_graph(filter_graph)
+        for idx, output_path in enumerate(outputs[:nb_videos]):
+            rendition_preset = preset
+            if bitrates:
+                rendition_preset = EncoderPreset(**dict(vars(preset or EncoderPreset()), video_bitrate=bitrates[idx]))
+            output_options = rendition_preset.options(encoders, self.output_ext()) if rendition_preset else []
+            cmd_command.add_output(output_path, "-map", f"[out{idx}]", "-map", "0:a?", *output_options,
+                                   *self.threads_option())
+        if len(outputs) > nb_videos:
+            audio_encoder = get_capabilities().best_encoder(dic_muxer_default_encoders[".m4a"]["audio"]) or "aac"
+            audio_options = (preset or EncoderPreset()).audio_options(audio_encoder)
+            cmd_command.add_output(outputs[-1], "-map", "0:a", "-vn", *audio_options, *self.threads_option())
+        return cmd_command.argv()
+
+
+    def package(self, heights: list = (1080, 720, 480), bitrates: list = None, segment_duration: int = 6,
+                preset: EncoderPreset = None):
+        """
+        Empaquetage HLS (sortie .m3u8 : playlist maître) ou DASH (sortie .mpd) en plusieurs qualités.
+        Les qualités sont encodées en parallèle, avec des images clés alignées toutes les
+        STREAMING_KEYFRAME_INTERVAL s, dans des fichiers intermédiaires conservés ("renditions/<sortie>/") ;
+        elles sont ensuite segmentées sans réencodage. Une qualité déjà encodée avec les mêmes réglages
+        est réutilisée : changer la durée des segments ou la playlist ne réencode rien.
+        Les qualités remplacées ne sont supprimées qu'une fois l'empaquetage réussi.
+        Renvoie un JobPlan.
+        """
+        output_ext = os.path.splitext(self.output_path)[1].lower()
+        if output_ext not in (".m3u8", ".mpd"):
+            raise ValueError(f"Sortie .m3u8 (HLS) ou .mpd (DASH) attendue : {self.output_path}")
+        if segment_duration % STREAMING_KEYFRAME_INTERVAL:
+            raise ValueError(f"La durée des segments doit être un multiple de {STREAMING_KEYFRAME_INTERVAL} s")
+
+        info = self.probe()
+        if not info.has_video:
+            raise ValueError(f"Pas de flux vidéo dans {self.input_path}")
+        output_dir = os.path.dirname(os.path.abspath(self.output_path))
+        output_stem = os.path.splitext(os.path.basename(self.output_path))[0]
+        renditions_dir = os.path.join(output_dir, "renditions", output_stem)
+        os.makedirs(renditions_dir, exist_ok=True)
+
+        preset = preset or EncoderPreset()
+        encoder = get_capabilities().best_encoder("libx264", "h264") or "libx264"
+        threads = max(1, (os.cpu_count() or 1) // len(heights))
+        input_fingerprint = file_fingerprint(self.input_path)
+
+        def encode_argv(height: int, video_options: list, audio_options: list, rendition_path: str) -> list:
+            cmd_command = FfmpegCommand()
+            cmd_command.add_input(self.input_path)
+            cmd_command.add_video_filter(f"scale=-2:min({height}\\,ih)")
+            cmd_command.add_output(rendition_path, "-map", "0:v:0", *video_options, *audio_options,
+                                   "-threads", threads)
+            return cmd_command.argv()
+
+        encode_commands, rendition_paths = [], []
+        for idx, height in enumerate(heights):
+            bitrate = bitrates[idx] if bitrates else dic_ladder_bitrates.get(height, preset.video_bitrate or "2000k")
+            kbps = bitrate_to_kbps(bitrate)
+            rendition_preset = EncoderPreset(**dict(vars(preset), video_codec=encoder, video_bitrate=bitrate))
+            video_options = rendition_preset.video_options(encoder) + [
+                "-maxrate", f"{round(kbps * 1.07)}k", "-bufsize", f"{round(2 * kbps)}k",
+                "-force_key_frames", f"expr:gte(t,n_forced*{STREAMING_KEYFRAME_INTERVAL})"]
+            if encoder == "libx264":
+                video_options += ["-sc_threshold", "0"]  # pas d'images clés en plus aux changements de plan
+            audio_options = ["-map", "0:a:0", *rendition_preset.audio_options("aac"), "-ac", "2"] \
+                if info.has_audio else []
+
+            # les réglages d'encodage sont dans le nom du fichier : s'il existe et est lisible, il est réutilisé.
+            # La commande ne dépend pas du nom choisi, qui est remplacé par un marqueur dans ces réglages.
+            draft_path = os.path.join(renditions_dir, f"{height}p.mp4")
+            draft_argv = encode_argv(height, video_options, audio_options, draft_path)
+            settings = json.dumps([input_fingerprint, normalize_argv(draft_argv, [self.input_path], draft_path)])
+            stamp = hashlib.sha1(settings.encode("utf-8")).hexdigest()[:16]
+            rendition_path = os.path.join(renditions_dir, f"{height}p_{stamp}.mp4")
+            rendition_paths.append(rendition_path)
+            if not self.is_complete(rendition_path):
+                encode_commands.append(encode_argv(height, video_options, audio_options, rendition_path))
+
+        def prune_renditions():
+            """ Supprime les qualités encodées avec d'autres réglages, devenues inutiles """
+            for old_path in glob.glob(os.path.join(renditions_dir, "*p_*.mp4")):
+                if old_path not in rendition_paths:
+                    os.remove(old_path)
+
+        package_command = FfmpegCommand()
+        for rendition_path in rendition_paths:
+            package_command.add_input(rendition_path)
+        stream_maps = []
+        for idx in range(len(heights)):
+            stream_maps += ["-map", f"{idx}:v"]
+            if info.has_audio and output_ext == ".m3u8":
+                stream_maps += ["-map", f"{idx}:a"]
+        if info.has_audio and output_ext == ".mpd":
+            stream_maps += ["-map", "0:a"]  # une seule piste audio, commune à toutes les qualités
+
+        if output_ext == ".m3u8":
+            variants = " ".join(f"v:{idx},a:{idx},name:{height}p" if info.has_audio else f"v:{idx},name:{height}p"
+                                for idx, height in enumerate(heights))
+            package_command.add_output(os.path.join(output_dir, "%v", "index.m3u8"), *stream_maps, "-c", "copy",
+                                       "-f", "hls", "-hls_time", segment_duration, "-hls_playlist_type", "vod",
+                                       "-hls_segment_filename", os.path.join(output_dir, "%v", "segment_%05d.ts"),
+                                       "-master_pl_name", os.path.basename(self.output_path),
+                                       "-var_stream_map", variants)
+        else:
+            adaptation_sets = "id=0,streams=v id=1,streams=a" if info.has_audio else "id=0,streams=v"
+            package_command.add_output(self.output_path, *stream_maps, "-c", "copy", "-f", "dash",
+                                       "-seg_duration", segment_duration, "-use_template", "1", "-use_timeline", "1",
+                                       "-adaptation_sets", adaptation_sets)
+
+        steps = [encode_commands, [package_command.argv()]] if encode_commands else [[package_command.argv()]]
+        return JobPlan(steps, on_success=prune_renditions)
+
+
+    def thumbnail_outputs(self, count: int) -> list:
+        """ Fichiers produits par thumbnails : "film_001.jpg", "film_002.jpg"... """
+        stem, ext = os.path.splitext(self.output_path)
+        return [f"{stem}_{idx + 1:03d}{ext}" for idx in range(count)]
+
+
+    def thumbnails(self, count: int = 9, width: int = 320, sheet: bool = False, columns: int = None) -> list:
+        """
+        count vignettes réparties sur toute la vidéo (voir thumbnail_outputs), ou une planche contact
+        (sheet=True) de columns colonnes dans output_path, en un seul ffmpeg.
+        Chaque vignette est une entrée ouverte à son instant (-ss avant -i) dont seules les images clés sont
+        décodées (-skip_frame nokey) : on garde la dernière image clé avant cet instant, sans décoder le reste.
+        """
+        info = self.probe()
+        if not info.has_video or not info.duration:
+            raise ValueError(f"Pas de flux vidéo de durée connue dans {self.input_path}")
+
+        cmd_command = FfmpegCommand()
+        filter_graph = FilterGraph()
+        labels = [f"t{idx}" for idx in range(count)]
+        for idx, label in enumerate(labels):
+            t = (idx + 0.5) * info.duration / count
+            input_idx = cmd_command.add_input(self.input_path, *self.input_options(), "-skip_frame", "nokey",
+                                              "-noaccurate_seek", "-ss", f"{t:.3f}")
+            filter_graph.add([f"{input_idx}:v:0"], ["trim=end_frame=1", f"scale={width}:-2", "setsar=1"], [label])
+        cmd_command.set_filter_graph(filter_graph)
+
+        if not sheet:
+            for label, output_path in zip(labels, self.thumbnail_outputs(count)):
+                cmd_command.add_output(output_path, "-map", f"[{label}]", "-frames:v", 1, "-q:v", 3,
+                                       *self.threads_option())
+            return cmd_command.argv()
+
+        columns = columns or math.ceil(math.sqrt(count))
+        rows = math.ceil(count / columns)
+        filter_graph.add(labels, [f"concat=n={count}:v=1:a=0", f"tile={columns}x{rows}:padding=4:margin=4"],
+                         ["sheet"])
+        cmd_command.add_output(self.output_path, "-map", "[sheet]", "-frames:v", 1, "-q:v", 3,
+                               *self.threads_option())
+        return cmd_command.argv()
+
+
+    @staticmethod
+    def is_complete(path: str) -> bool:
+        """ Le fichier existe-t-il et est-il lisible jusqu'au bout (un MP4 interrompu n'a pas d'index) ? """
+        if not os.path.exists(path):
+            return False
+        try:
+            return bool(probe(path).duration)
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            return False
+
+
+    async def run_async(self, build, *args, on_progress=None, timeout: float = None, runner=None,
+                        duration: float = None, **kwargs) -> None:
+        """
+        Construit la commande avec build(*args, **kwargs) dans un thread (ffprobe peut être appelé),
+        puis l'exécute sans bloquer la boucle asyncio.
+        runner : AsyncJobRunner partagé pour limiter le nombre de ffmpeg simultanés
+        """
+        cmd = await asyncio.to_thread(build, *args, **kwargs)
+        if runner is not None:
+            await runner.run(cmd, on_progress, duration, self.input_path, timeout)
+        else:
+            await run_async(cmd, on_progress, duration, self.input_path, timeout)
+
+
+    async def compress_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.compress, *args, **kwargs)
+
+
+    async def convert_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.convert, *args, **kwargs)
+
+
+    async def extract_image_async(self, **kwargs) -> None:
+        await self.run_async(self.extract_image, **kwargs)
+
+
+    async def extract_audio_async(self, **kwargs) -> None:
+        await self.run_async(self.extract_audio, **kwargs)
+
+
+    async def transform_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.transform, *args, **kwargs)
+
+
+    async def rotate_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.rotate, *args, **kwargs)
+
+
+    async def crop_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.crop, *args, **kwargs)
+
+
+    async def ladder_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.ladder, *args, **kwargs)
+
+
+    async def package_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.package, *args, **kwargs)
+
+
+    async def thumbnails_async(self, *args, **kwargs) -> None:
+        await self.run_async(self.thumbnails, *args, **kwargs)
+
+
+    async def cut_duration_async(self, begin: str, end: str, smart: bool = False, **kwargs) -> None:
+        kwargs.setdefault("duration", hms_to_seconds(end) - hms_to_seconds(begin))
+        await self.run_async(self.cut_duration, begin, end, smart, **kwargs)
+
+
+def natural_sort_key(path: str) -> list:
+    """ Clé de tri "naturel" : "clip2.mp4" avant "clip10.mp4" """
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", path)]
+
+
+def read_concat_list(list_path: str) -> list:
+    """ Chemins d'une liste "file '...'" du démuxeur concat (relatifs au dossier de la liste) """
+    list_dir = os.path.dirname(os.path.abspath(list_path))
+    paths = []
+    with open(list_path, "r", encoding="utf-8") as list_file:
+        for line in list_file:
+            keyword, _, value = line.strip().partition(" ")
+            if keyword != "file":
+                continue
+            value = value.strip()
+            if value.startswith("'") and value.endswith("'"):
+                value = value[1:-1].replace("'\\''", "'")
+            paths.append(os.path.join(list_dir, value))
+    return paths
+
+
+def list_concat_inputs(source: str) -> list:
+    """ Vidéos à concaténer : liste .txt (dans son ordre), dossier (fichiers vidéo) ou motif glob (tri naturel) """
+    if os.path.isfile(source) and source.lower().endswith(".txt"):
+        return read_concat_list(source)
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)
+                 if os.path.splitext(name)[1].lower() in list_video_exts]
+    else:
+        paths = glob.glob(source)
+    return sorted((path for path in paths if os.path.isfile(path) and not path.lower().endswith(".txt")),
+                  key=natural_sort_key)
+
+
+def pattern_to_regex(pattern: str):
+    """ "image%03d.jpeg" -> expression qui reconnaît "image001.jpeg", "image1234.jpeg"... """
+    parts = re.split(r"%0?\d*d", pattern)
+    return re.compile(r"(\d+)".join(re.escape(part) for part in parts) + "$")
+
+
+def list_image_inputs(source: str) -> list:
+    """
+    Images d'une séquence : motif "image%03d.jpeg" (les numéros manquants sont ignorés),
+    liste .txt (dans son ordre), dossier ou motif glob (tri naturel)
+    """
+    if os.path.isfile(source) and source.lower().endswith(".txt"):
+        return read_concat_list(source)
+    if "%" in os.path.basename(source):
+        image_dir, pattern = os.path.split(source)
+        regex = pattern_to_regex(pattern)
+        paths = [os.path.join(image_dir, name) for name in os.listdir(image_dir or ".") if regex.match(name)]
+    elif os.path.isdir(source):
+        image_exts = {ext for ext, format_name in dic_ext_formats.items() if format_name == "image2"}
+        paths = [os.path.join(source, name) for name in os.listdir(source)
+                 if os.path.splitext(name)[1].lower().lstrip(".") in image_exts]
+    else:
+        paths = glob.glob(source)
+    return sorted((path for path in paths if os.path.isfile(path)), key=natural_sort_key)
+
+
+def concat_signature(info: MediaInfo) -> tuple:
+    """ Paramètres qui doivent être identiques entre les vidéos pour les recoller sans réencodage """
+    frame_rate = round(info.frame_rate, 3) if info.frame_rate else None
+    return (info.video_codec, info.video_profile, info.width, info.height, info.pix_fmt, frame_rate,
+            info.audio_codec, info.sample_rate, info.channels)
+
+
+class FilesInput:
+    def __init__(self, input_path: str, output_path: str):
+        self.input_path = input_path  # motif d'images, ou liste .txt / dossier / motif glob de vidéos
+        self.output_path = output_path
+
+
+    def concatenate_images(self, framerate: str, quality: str, preset: EncoderPreset = None, width: int = None,
+                           height: int = None, chunks: int = None):
+        """
+        Vidéo à partir d'une séquence d'images (motif "image%03d.jpeg", glob, dossier ou liste .txt), sans avoir
+        à les renommer : les numéros manquants sont sautés, et chaque image est mise à la taille de sortie
+        (par défaut celle de la 1ère image) en gardant ses proportions. Les longues séquences sont découpées
+        en morceaux encodés en parallèle puis recollés sans réencodage. Renvoie un JobPlan.
+        """
+        image_files = list_image_inputs(self.input_path)
+        if not image_files:
+            raise ValueError(f"Aucune image ne correspond à {self.input_path}")
+
+        if not width or not height:
+            try:
+                info = probe(image_files[0])
+                if width:
+                    height = info.height * width / info.width
+                elif height:
+                    width = info.width * height / info.height
+                else:
+                    width, height = info.width, info.height
+            except (OSError, ValueError, TypeError, subprocess.CalledProcessError) as e:
+                raise ValueError(f"Taille de {image_files[0]} illisible : {e}")
+        width, height = 2 * max(1, round(width / 2)), 2 * max(1, round(height / 2))
+
+        if chunks is None:
+            chunks = os.cpu_count() or 1
+        nb_chunks = max(1, min(chunks, len(image_files) // MIN_CHUNK_FRAMES))
+        threads = max(1, (os.cpu_count() or 1) // nb_chunks)
+        # sans preset : qualité du slider, avec l'encodeur par défaut du conteneur de sortie
+        output_ext = os.path.splitext(self.output_path)[1].lower()
+        encoder = dic_muxer_default_encoders.get(output_ext, {}).get("video", "libx264")
+        preset = preset or EncoderPreset(crf=int(quality))
+        video_options = preset.video_options(get_capabilities().best_encoder(encoder) or encoder, output_ext)
+        # chaque image à la taille de sortie (bandes noires si ses proportions diffèrent), à intervalle régulier
+        video_filters = [f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+                         f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2", "setsar=1", f"setpts=N/({framerate}*TB)"]
+
+        temp_dir = tempfile.mkdtemp(prefix="ffmpeg_python_images_")
+        chunk_commands = []
+        chunk_paths = []
+        chunk_size = -(-len(image_files) // nb_chunks)
+        for idx in range(nb_chunks):
+            images_list_path = os.path.join(temp_dir, f"images{idx}.txt")
+            with open(images_list_path, "w", encoding="utf-8") as list_file:
+                for path in image_files[idx * chunk_size:(idx + 1) * chunk_size]:
+                    list_file.write(concat_list_line(os.path.abspath(path)))
+
+            chunk_path = self.output_path if nb_chunks == 1 else os.path.join(temp_dir, f"chunk{idx}.mkv")
+            chunk_paths.append(chunk_path)
+            chunk_command = FfmpegCommand()
+            chunk_command.add_input(images_list_path, "-f", "concat", "-safe", "0")
+            chunk_command.add_video_filter(*video_filters)
+            chunk_command.add_output(chunk_path, *video_options, "-pix_fmt", "yuv420p", "-r", framerate,
+                                     "-threads", threads)
+            chunk_commands.append(chunk_command.argv())
+
+        if nb_chunks == 1:
+            return JobPlan([chunk_commands], temp_dir=temp_dir)
+
+        list_path = os.path.join(temp_dir, "chunks.txt")
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for chunk_path in chunk_paths:
+                list_file.write(concat_list_line(os.path.basename(chunk_path)))
+        return JobPlan([chunk_commands, [self.concat_list_command(list_path)]], temp_dir=temp_dir)
+
+
+    def concatenate_videos(self, audio_path: str = None, validate: bool = True):
+        """
+        Concaténation sans réencodage (audio_path : piste audio à ajouter à la place de celle des vidéos).
+        Les vidéos (liste .txt, dossier ou motif glob) sont analysées en parallèle : celles dont les paramètres
+        diffèrent de ceux de la majorité sont réencodées à l'identique des autres avant d'être recollées
+        (JobPlan). validate=False : liste .txt utilisée telle quelle, sans analyse.
+        """
+        if not validate:
+            return self.concat_list_command(self.input_path, audio_path)
+
+        input_files = list_concat_inputs(self.input_path)
+        if not input_files:
+            raise ValueError(f"Aucune vidéo à concaténer : {self.input_path}")
+
+        nb_workers = min(len(input_files), 2 * default_max_workers())
+        with ThreadPoolExecutor(max_workers=nb_workers) as pool:
+            futures = [pool.submit(probe, path) for path in input_files]
+        infos = []
+        for path, future in zip(input_files, futures):
+            try:
+                infos.append(future.result())
+            except (ValueError, subprocess.CalledProcessError):
+                raise ValueError(f"Vidéo illisible, impossible de la concaténer : {path}")
+            except OSError as e:
+                raise ValueError(f"Analyse de {path} impossible (ffprobe introuvable ?), concaténation annulée : {e}")
+
+        signatures = [concat_signature(info) for info in infos]
+        reference = Counter(signatures).most_common(1)[0][0] if signatures else None
+        mismatched = [idx for idx, signature in enumerate(signatures) if signature != reference]
+        if not mismatched and self.input_path.lower().endswith(".txt"):
+            return self.concat_list_command(self.input_path, audio_path)
+
+        temp_dir = tempfile.mkdtemp(prefix="ffmpeg_python_concat_")
+        list_path = os.path.join(temp_dir, "videos.txt")
+        clip_commands = []
+        output_options = []
+        if mismatched:
+            reference_info = infos[signatures.index(reference)]
+            # Un réencodage n'a jamais les mêmes paramètres de codec (SPS/PPS) que les autres vidéos :
+            # en mpegts, chaque morceau garde les siens dans le flux, et les vidéos conformes y sont juste copiées.
+            # Sinon toutes les vidéos sont réencodées.
+            to_ts = reference_info.video_codec in list_ts_codecs
+            to_encode = mismatched if to_ts else range(len(input_files))
+            clip_ext = ".ts" if to_ts else os.path.splitext(input_files[signatures.index(reference)])[1]
+            threads = max(1, (os.cpu_count() or 1) // len(to_encode))
+            for idx, path in enumerate(input_files):
+                clip_path = os.path.join(temp_dir, f"clip{idx}{clip_ext}")
+                if idx in to_encode:
+                    clip_commands.append(self.normalize_clip(path, infos[idx], reference_info, clip_path, threads))
+                else:
+                    clip_commands.append(self.ts_copy_command(path, infos[idx], clip_path))
+                input_files[idx] = clip_path
+
+            output_ext = os.path.splitext(self.output_path)[1].lower()
+            if to_ts and reference_info.audio_codec == "aac" and output_ext in list_asc_muxers and not audio_path:
+                output_options = ["-bsf:a", "aac_adtstoasc"]
+
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for path in input_files:
+                list_file.write(concat_list_line(os.path.abspath(path)))
+
+        concat_command = self.concat_list_command(list_path, audio_path, output_options)
+        steps = [clip_commands, [concat_command]] if clip_commands else [[concat_command]]
+        return JobPlan(steps, temp_dir=temp_dir)
+
+
+    @staticmethod
+    def ts_copy_command(input_path: str, info: MediaInfo, clip_path: str) -> list:
+        """ Copie une vidéo, sans réencodage, dans un morceau mpegts """
+        bsf_options = []
+        source_formats = set(info.format_name.split(","))
+        if info.video_codec in dic_remux_bsf_annexb and not {"mpegts", "h264", "hevc"} & source_formats:
+            bsf_options = ["-bsf:v", dic_remux_bsf_annexb[info.video_codec]]
+        cmd_command = FfmpegCommand()
+        cmd_command.add_input(input_path)
+        cmd_command.add_output(clip_path, "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy", *bsf_options, "-sn", "-dn")
+        return cmd_command.argv()
+
+
+    @staticmethod
+    def normalize_clip(input_path: str, info: MediaInfo, reference: MediaInfo, clip_path: str, threads: int) -> list:
+        """ Réencode une vidéo avec les paramètres (codec, taille, cadence, audio) de la vidéo de référence """
+        capabilities = get_capabilities()
+        video_codec = reference.video_codec
+        encoder = capabilities.best_encoder(dic_codec_encoders.get(video_codec, video_codec), video_codec)
+        video_options = ["-c:v", encoder or "libx264"]
+        if encoder in ("libx264", "libx265"):
+            video_options += ["-crf", "18"]
+            if reference.video_profile:
+                # "High" -> "high", "Constrained Baseline" -> "baseline", "Main 10" -> "main10"
+                profile = reference.video_profile.lower().replace("constrained ", "").replace(" ", "")
+                video_options += ["-profile:v", profile]
+        if reference.pix_fmt:
+            video_options += ["-pix_fmt", reference.pix_fmt]
+
+        width, height = reference.width, reference.height
+        reference_rate = reference.video_streams[0].get("avg_frame_rate") or reference.frame_rate
+        video_filters = [f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+                         f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2", "setsar=1", f"fps={reference_rate}"]
+
+        cmd_command = FfmpegCommand()
+        cmd_command.add_input(input_path)
+        cmd_command.add_video_filter(*video_filters)
+        if not reference.has_audio:
+            cmd_command.add_output(clip_path, "-map", "0:v:0", *video_options, "-an", "-sn", "-threads", threads)
+            return cmd_command.argv()
+
+        audio_codec = reference.audio_codec
+        audio_encoder = capabilities.best_encoder(dic_codec_encoders.get(audio_codec, audio_codec), audio_codec)
+        audio_options = ["-c:a", audio_encoder or "aac", "-ar", reference.sample_rate, "-ac", reference.channels]
+        if info.has_audio:
+            audio_map = ["-map", "0:a:0"]
+        else:
+            # piste muette pour que toutes les vidéos aient les mêmes flux
+            cmd_command.add_input(f"anullsrc=sample_rate={reference.sample_rate}", "-f", "lavfi")
+            audio_map = ["-map", "1:a:0", "-shortest"]
+        cmd_command.add_output(clip_path, "-map", "0:v:0", *audio_map, *video_options, *audio_options, "-sn",
+                               "-threads", threads)
+        return cmd_command.argv()
+
+
+    def concat_list_command(self, list_path: str, audio_path: str = None, output_options: list = ()) -> list:
+        cmd_command = FfmpegCommand()
+        cmd_command.add_input(list_path, "-f", "concat", "-safe", "0")
+        if audio_path:
+            cmd_command.add_input(audio_path)
+            cmd_command.add_output(self.output_path, "-map", "0:v", "-map", "1:a", "-c", "copy", *output_options)
+            return cmd_command.argv()
+
+        cmd_command.add_output(self.output_path, "-c", "copy", *output_options)
+        return cmd_command.argv()
+
+
+# Opérations utilisables dans la description d'un job (ligne de commande, fichiers de jobs)
+MEDIA_OPERATIONS = ("compress", "convert", "extract_image", "extract_audio", "rotate", "crop", "cut_duration",
+                    "transform", "ladder", "package", "thumbnails")
+FILES_OPERATIONS = ("concatenate_images", "concatenate_videos")
+
+# Opérations qui écrivent plusieurs fichiers
+MULTI_OUTPUT_OPERATIONS = ("ladder", "package")
+
+
+def normalize_options(options: dict) -> dict:
+    """ Remplace le préréglage, nommé ("standard") ou décrit ({"crf": 20, "speed": "fast"}), par un EncoderPreset """
+    options = dict(options)
+    preset = options.get("preset")
+    if isinstance(preset, str):
+        options["preset"] = dic_presets[preset]
+    elif isinstance(preset, dict):
+        options["preset"] = EncoderPreset(**preset)
+    return options
+
+
+def build_job(spec: dict):
+    """
+    Construit la commande (ou le JobPlan) d'un job décrit par un dictionnaire, ex :
+    {"operation": "rotate", "inputs": ["in.mp4"], "output": "out.mp4", "options": {"rotation": "right"}}
+    """
+    operation = spec["operation"]
+    input_path = spec["inputs"][0]
+    options = normalize_options(spec.get("options", {}))
+
+    if operation in MEDIA_OPERATIONS:
+        media = MediaObject(input_path, spec["output"], threads=options.pop("threads", None))
+        if operation == "transform":
+            filters = options.pop("filters", [])
+            return media.transform(*([filters] if isinstance(filters, str) else filters), **options)
+        return getattr(media, operation)(**options)
+
+    if operation in FILES_OPERATIONS:
+        return getattr(FilesInput(input_path, spec["output"]), operation)(**options)
+
+    raise ValueError(f"Opération inconnue : {operation}")
+
+
+def job_input_files(spec: dict) -> list:
+    """
+    Fichiers lus par un job : pour les concaténations, la liste .txt et les vidéos ou images qu'elle cite
+    (ou celles du dossier, du motif) ; sinon ses entrées
+    """
+    operation, input_path = spec["operation"], spec["inputs"][0]
+    try:
+        if operation == "concatenate_videos":
+            files = list_concat_inputs(input_path)
+        elif operation == "concatenate_images":
+            files = list_image_inputs(input_path)
+        else:
+            return list(spec["inputs"])
+    except OSError:
+        return list(spec["inputs"])
+    return [input_path] + files if os.path.isfile(input_path) else files
+
+
+def job_cache_inputs(spec: dict):
+    """
+    Fichiers à passer en cache_inputs (voir run_cached), ou None si le résultat ne doit pas être mis en cache :
+    le cache ne garde que le fichier de sortie, pas les qualités, playlists, segments ou vignettes
+    qu'écrivent ladder, package et thumbnails (sans planche contact) à côté
+    """
+    operation = spec["operation"]
+    if operation in MULTI_OUTPUT_OPERATIONS:
+        return None
+    if operation == "thumbnails" and not spec.get("options", {}).get("sheet"):
+        return None
+    return job_input_files(spec)
+
+
+def expected_duration(spec: dict):
+    """ Durée attendue de la sortie d'un job quand elle diffère de celle de l'entrée (coupe), sinon None """
+    if spec["operation"] == "cut_duration":
+        options = spec.get("options", {})
+        return hms_to_seconds(options["end"]) - hms_to_seconds(options["begin"])
+    return None
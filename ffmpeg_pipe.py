@@ -0,0 +1,132 @@
+"""
+Entrées/sorties de ffmpeg en flux (pipe:0 / pipe:1), sans fichiers intermédiaires, ex :
+
+    extract = MediaObject("pipe:0", "pipe:1", input_format="matroska", output_format="adts").extract_audio()
+    transcode = MediaObject("pipe:0", "pipe:1", input_format="aac", output_format="ogg").convert(lossy=True)
+    with open("film.mkv", "rb") as source:
+        run_piped(transcode, source=stream(extract, source), sink=connexion)  # socket, fichier, fonction...
+
+Chaque étape lit la sortie de ffmpeg par morceaux dans une file bornée : si l'étape suivante
+(ou la destination) est plus lente, ffmpeg est mis en attente, la mémoire utilisée reste bornée.
+"""
+import queue
+import subprocess
+import threading
+
+PIPE_CHUNK_SIZE = 1 << 16  # 64 Kio
+PIPE_QUEUE_CHUNKS = 16     # morceaux lus d'avance par étape (1 Mio)
+
+_END = object()
+
+
+def iter_chunks(source, chunk_size: int = PIPE_CHUNK_SIZE):
+    """ Morceaux d'octets d'une source : bytes, fichier (read), socket (recv) ou itérable de bytes """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+        return
+    read = getattr(source, "read", None) or getattr(source, "recv", None)
+    if read is None:
+        yield from source
+        return
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_chunks(sink, chunks) -> None:
+    """ Écrit les morceaux dans une destination : socket (sendall), fichier (write) ou fonction """
+    write = getattr(sink, "sendall", None) or getattr(sink, "write", None) or sink
+    for chunk in chunks:
+        write(chunk)
+
+
+def stream(cmd: list, source=None, chunk_size: int = PIPE_CHUNK_SIZE, max_chunks: int = PIPE_QUEUE_CHUNKS):
+    """
+    Lance ffmpeg en lui envoyant la source sur son entrée standard (si elle est donnée)
+    et renvoie les morceaux de sa sortie standard au fur et à mesure (générateur).
+    Lève CalledProcessError si ffmpeg échoue ; abandonner le générateur arrête ffmpeg.
+    """
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL if source is None else subprocess.PIPE,
+                               stdout=subprocess.PIPE)
+    chunks = queue.Queue(maxsize=max_chunks)
+    stop = threading.Event()
+    feed_errors = []
+
+    def feed():
+        source_chunks = iter_chunks(source, chunk_size)
+        try:
+            for chunk in source_chunks:
+                if stop.is_set():
+                    break
+                process.stdin.write(chunk)  # bloque tant que ffmpeg n'a pas consommé : contre-pression
+        except BrokenPipeError:
+            pass  # ffmpeg s'est arrêté : son code de retour dira pourquoi
+        except Exception as e:
+            feed_errors.append(e)
+            process.kill()
+        finally:
+            if hasattr(source_chunks, "close"):
+                source_chunks.close()
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    def read():
+        while True:
+            chunk = process.stdout.read1(chunk_size)  # ce qui est disponible, sans attendre un morceau complet
+            item = chunk or _END
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if not chunk or stop.is_set():
+                return
+
+    threads = [threading.Thread(target=read, daemon=True)]
+    if source is not None:
+        threads.append(threading.Thread(target=feed, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    chunk = None
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _END:
+                break
+            yield chunk
+    finally:
+        stop.set()
+        if process.poll() is None and chunk is not _END:
+            process.kill()  # générateur abandonné avant la fin
+        returncode = process.wait()
+        threads[0].join()  # l'envoi peut rester bloqué sur une source lente : il s'arrêtera au morceau suivant
+        process.stdout.close()
+
+    if feed_errors:
+        raise feed_errors[0]
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+def pipeline(commands: list, source=None, chunk_size: int = PIPE_CHUNK_SIZE):
+    """ Enchaîne plusieurs commandes ffmpeg : la sortie de chacune est l'entrée de la suivante """
+    chunks = source
+    for cmd in commands:
+        chunks = stream(cmd, chunks, chunk_size)
+    return chunks
+
+
+def run_piped(cmd: list, source=None, sink=None, chunk_size: int = PIPE_CHUNK_SIZE) -> None:
+    """ Exécute ffmpeg entre une source et une destination (sans destination, la sortie est ignorée) """
+    chunks = stream(cmd, source, chunk_size)
+    if sink is None:
+        for _ in chunks:
+            pass
+    else:
+        write_chunks(sink, chunks)
@@ -0,0 +1,139 @@
+from ffmpeg_capabilities import get_capabilities
+from ffmpeg_supported_ext import dic_codec_encoders, dic_muxer_codecs
+
+# Vitesses d'encodage proposées, traduites en -preset pour x264/x265 et en -cpu-used pour libvpx/libaom
+dic_speeds = {"rapide": "veryfast", "équilibré": "medium", "compact": "slow"}
+dic_speed_cpu_used = {"ultrafast": 8, "superfast": 7, "veryfast": 5, "faster": 4, "fast": 3, "medium": 2,
+                      "slow": 1, "slower": 0, "veryslow": 0}
+
+# Réglages -tune acceptés par x265 (x264 en accepte d'autres, comme "film")
+list_x265_tunes = ["grain", "animation", "psnr", "ssim", "fastdecode", "zerolatency"]
+
+# Codec produit par chaque encodeur de dic_codec_encoders ("libx265" -> "hevc")
+dic_encoder_codecs = {encoder: codec for codec, encoder in dic_codec_encoders.items()}
+
+# Débit vidéo de chaque hauteur d'une échelle de qualités pour le streaming (HLS/DASH)
+dic_ladder_bitrates = {2160: "14000k", 1440: "8000k", 1080: "5000k", 720: "2800k", 480: "1400k", 360: "800k",
+                       240: "400k"}
+
+# Multiplicateurs des suffixes de débit de ffmpeg
+dic_bitrate_units = {"k": 1e3, "m": 1e6, "g": 1e9}
+
+
+def bitrate_to_kbps(bitrate) -> float:
+    """ Débit au format ffmpeg ("800k", "5M", "2.5M", ou en bit/s sans suffixe) -> kbit/s """
+    text = str(bitrate).strip().lower()
+    unit = dic_bitrate_units.get(text[-1:], None)
+    value = float(text[:-1] if unit else text)
+    return value * (unit or 1) / 1e3
+
+
+# Bornes du CRF (échelle x264) correspondant aux extrémités du slider de compression
+CRF_MIN = 18
+CRF_MAX = 35
+
+
+class EncoderPreset:
+    """
+    Réglages d'encodage indépendants du matériel : codec, qualité (CRF, échelle x264) ou débit,
+    vitesse (-preset x264) et audio. options() les traduit, en arguments ffmpeg, pour l'encodeur réellement utilisé.
+    """
+    def __init__(self, video_codec: str = None, crf: int = 23, video_bitrate: str = None, speed: str = "medium",
+                 tune: str = None, audio_codec: str = None, audio_bitrate: str = "128k"):
+        self.video_codec = video_codec  # encodeur préféré ; None : encodeur par défaut du conteneur
+        self.crf = crf
+        self.video_bitrate = video_bitrate
+        self.speed = speed
+        self.tune = tune
+        self.audio_codec = audio_codec
+        self.audio_bitrate = audio_bitrate
+
+
+    def video_encoder(self, default_encoder: str, output_ext: str = None) -> str:
+        """
+        L'encodeur du préréglage (ou un autre du même codec) s'il est compilé dans ffmpeg et que son codec
+        entre dans le conteneur de sortie (output_ext, ex : ".webm"), sinon default_encoder, celui du conteneur
+        """
+        if not self.video_codec:
+            return default_encoder
+        capabilities = get_capabilities()
+        encoder = capabilities.best_encoder(self.video_codec)
+        if encoder is None:
+            return default_encoder
+
+        accepted_codecs = dic_muxer_codecs.get(output_ext.lower(), {}) if output_ext else None
+        if accepted_codecs is not None:
+            codec = dic_encoder_codecs.get(self.video_codec) or capabilities.codec_of(self.video_codec)
+            if codec not in accepted_codecs.get("video", ()):
+                return default_encoder
+        return encoder
+
+
+    def video_options(self, default_encoder: str = "libx264", output_ext: str = None) -> list:
+        encoder = self.video_encoder(default_encoder, output_ext)
+        options = ["-c:v", encoder]
+
+        if encoder in ("libx264", "libx265"):
+            options += ["-b:v", self.video_bitrate] if self.video_bitrate else ["-crf", str(self.crf)]
+            options += ["-preset", self.speed]
+            if self.tune and (encoder == "libx264" or self.tune in list_x265_tunes):
+                options += ["-tune", self.tune]
+
+        elif encoder in ("libvpx", "libvpx-vp9", "libaom-av1"):
+            # échelle de CRF 0-63 ; "-b:v 0" active le mode qualité constante
+            if self.video_bitrate:
+                options += ["-b:v", self.video_bitrate]
+            else:
+                options += ["-crf", str(round(self.crf * 63 / 51)), "-b:v", "0"]
+            options += ["-cpu-used", str(dic_speed_cpu_used.get(self.speed, 2))]
+            if encoder != "libaom-av1":
+                options += ["-deadline", "good"]
+
+        elif self.video_bitrate:
+            options += ["-b:v", self.video_bitrate]
+        else:
+            # encodeurs sans CRF (mpeg4, mpeg2video...) : quantificateur fixe 2 (meilleur) à 31
+            options += ["-q:v", str(max(2, min(31, round(2 + (self.crf - CRF_MIN) * 29 / (51 - CRF_MIN)))))]
+
+        return options
+
+
+    def audio_options(self, default_encoder: str = "aac") -> list:
+        options = ["-c:a", self.audio_codec or default_encoder]
+        if self.audio_bitrate:
+            options += ["-b:a", self.audio_bitrate]
+        return options
+
+
+    def options(self, encoders: dict = None, output_ext: str = None) -> list:
+        """
+        Options ffmpeg vidéo + audio ; encoders : encodeurs par défaut du conteneur de sortie,
+        output_ext : son extension (voir video_encoder)
+        """
+        encoders = encoders or {}
+        options = []
+        # conteneur connu sans vidéo (mp3...) ou sans audio (gif) : pas d'options pour ce type de flux
+        if not encoders or "video" in encoders:
+            options += self.video_options(encoders.get("video", "libx264"), output_ext)
+        if not encoders or "audio" in encoders:
+            options += self.audio_options(encoders.get("audio", "aac"))
+        return options
+
+
+# Préréglages prêts à l'emploi
+dic_presets = {
+    "ingestion rapide": EncoderPreset(crf=23, speed="veryfast", audio_bitrate="128k"),
+    "standard": EncoderPreset(crf=23, speed="medium", audio_bitrate="128k"),
+    "haute qualité": EncoderPreset(crf=18, speed="slow", tune="film", audio_bitrate="192k"),
+    "archivage léger": EncoderPreset(video_codec="libx265", crf=28, speed="slow", audio_bitrate="96k"),
+}
+
+
+def crf_from_compression(compression: int) -> int:
+    """ Slider de compression (0 : meilleure qualité, 100 : fichier le plus petit) -> CRF """
+    return round(CRF_MIN + (CRF_MAX - CRF_MIN) * int(compression) / 100)
+
+
+def preset_from_slider(compression: int, speed: str = "équilibré") -> EncoderPreset:
+    """ Préréglage correspondant au slider de compression et au choix vitesse/taille """
+    return EncoderPreset(crf=crf_from_compression(compression), speed=dic_speeds.get(speed, speed))
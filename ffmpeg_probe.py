@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Dossier des caches persistants de l'application
+CACHE_DIR = Path.home() / ".ffmpeg_python"
+
+PROBE_CACHE_FILE = CACHE_DIR / "probe_cache.json"
+PROBE_CACHE_MAX_ENTRIES = 2000
+
+# Empreintes du contenu des fichiers, recalculées seulement si leur taille ou leur date changent
+FINGERPRINT_CACHE_FILE = CACHE_DIR / "fingerprint_cache.json"
+FINGERPRINT_CACHE_MAX_ENTRIES = 20000
+
+# Taille des blocs lus pour calculer l'empreinte d'un fichier
+FINGERPRINT_CHUNK = 1 << 20
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rate_to_float(rate: str):
+    """ "30000/1001" -> 29.97 """
+    num, _, den = (rate or "").partition("/")
+    num, den = _to_float(num), _to_float(den or "1")
+    if not num or not den:
+        return None
+    return num / den
+
+
+class MediaInfo:
+    """ Résultat de ffprobe : format, durée et caractéristiques des flux """
+    def __init__(self, data: dict):
+        self.data = data
+        format_info = data.get("format", {})
+        self.format_name = format_info.get("format_name", "")
+        self.duration = _to_float(format_info.get("duration"))
+        # instant du premier paquet (≈1.4 s en MPEG-TS) : -ss en entrée se compte à partir de là
+        self.start_time = _to_float(format_info.get("start_time")) or 0.0
+        self.bit_rate = _to_float(format_info.get("bit_rate"))
+
+        self.streams = data.get("streams", [])
+        # les pochettes d'album sont des flux vidéo d'une seule image : on les ignore
+        self.video_streams = [stream for stream in self.streams if stream.get("codec_type") == "video"
+                              and not stream.get("disposition", {}).get("attached_pic")]
+        self.audio_streams = [stream for stream in self.streams if stream.get("codec_type") == "audio"]
+        self.subtitle_streams = [stream for stream in self.streams if stream.get("codec_type") == "subtitle"]
+
+        video = self.video_streams[0] if self.video_streams else {}
+        self.video_codec = video.get("codec_name")
+        self.video_profile = video.get("profile")
+        self.width = video.get("width")
+        self.height = video.get("height")
+        self.pix_fmt = video.get("pix_fmt")
+        self.frame_rate = _rate_to_float(video.get("avg_frame_rate")) or _rate_to_float(video.get("r_frame_rate"))
+
+        audio = self.audio_streams[0] if self.audio_streams else {}
+        self.audio_codec = audio.get("codec_name")
+        self.sample_rate = int(audio["sample_rate"]) if audio.get("sample_rate") else None
+        self.channels = audio.get("channels")
+
+        self.subtitle_codec = self.subtitle_streams[0].get("codec_name") if self.subtitle_streams else None
+
+    @property
+    def has_video(self) -> bool:
+        return bool(self.video_streams)
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio_streams)
+
+    def __repr__(self) -> str:
+        return (f"MediaInfo({self.format_name}, {self.duration}s, video={self.video_codec} "
+                f"{self.width}x{self.height}@{self.frame_rate}, audio={self.audio_codec})")
+
+
+class ProbeCache:
+    """
+    Cache disque des résultats de ffprobe (ou des empreintes de fichiers), indexé par chemin et invalidé
+    si la taille ou la date de modification du fichier changent. Les entrées les moins récemment utilisées
+    sont évincées.
+    """
+    def __init__(self, cache_file: Path = PROBE_CACHE_FILE, max_entries: int = PROBE_CACHE_MAX_ENTRIES):
+        self.cache_file = Path(cache_file)
+        self.max_entries = max_entries
+        self.entries = None  # chargé au premier accès
+        self.lock = threading.Lock()
+
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                self.entries = OrderedDict(json.load(file))
+        except (OSError, ValueError):
+            self.entries = OrderedDict()
+
+
+    def _save(self) -> None:
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(list(self.entries.items()), file)
+        os.replace(tmp_file, self.cache_file)
+
+
+    @staticmethod
+    def file_signature(path: str) -> list:
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+
+    def get(self, path: str):
+        key = os.path.abspath(path)
+        signature = self.file_signature(path)
+        with self.lock:
+            if self.entries is None:
+                self._load()
+            entry = self.entries.get(key)
+            if entry is None or entry["signature"] != signature:
+                return None
+            self.entries.move_to_end(key)
+            return entry["data"]
+
+
+    def put(self, path: str, data, save: bool = True) -> None:
+        """ save=False : l'entrée n'est écrite sur le disque qu'au prochain save() (ajouts en série) """
+        key = os.path.abspath(path)
+        signature = self.file_signature(path)
+        with self.lock:
+            if self.entries is None:
+                self._load()
+            self.entries[key] = {"signature": signature, "data": data}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if save:
+                self._save_or_warn()
+
+
+    def save(self) -> None:
+        with self.lock:
+            if self.entries is not None:
+                self._save_or_warn()
+
+
+    def _save_or_warn(self) -> None:
+        try:
+            self._save()
+        except OSError as e:
+            print(f"Impossible d'enregistrer le cache {self.cache_file.name} : {e}")
+
+
+probe_cache = ProbeCache()
+fingerprint_cache = ProbeCache(FINGERPRINT_CACHE_FILE, FINGERPRINT_CACHE_MAX_ENTRIES)
+
+
+def probe(path: str) -> MediaInfo:
+    """ Analyse le fichier avec ffprobe (une seule fois tant qu'il n'est pas modifié) """
+    data = probe_cache.get(path)
+    if data is None:
+        result = subprocess.run(["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams",
+                                 path], capture_output=True, text=True, encoding="utf-8", check=True)
+        data = json.loads(result.stdout)
+        probe_cache.put(path, data)
+    return MediaInfo(data)
+
+
+def probe_duration(path: str):
+    """ Durée (en secondes) du fichier, None si elle est inconnue ou si ffprobe échoue """
+    try:
+        return probe(path).duration
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+
+
+def file_fingerprint(path: str, save: bool = True) -> str:
+    """
+    Empreinte du contenu d'un fichier : SHA-1 de tout son contenu, mémorisé tant que sa taille et sa date
+    de modification ne changent pas. Deux fichiers de même empreinte ont le même contenu.
+    """
+    fingerprint = fingerprint_cache.get(path)
+    if fingerprint is None:
+        sha = hashlib.sha1()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(FINGERPRINT_CHUNK), b""):
+                sha.update(block)
+        fingerprint = sha.hexdigest()
+        fingerprint_cache.put(path, fingerprint, save=save)
+    return fingerprint
+
+
+def files_fingerprints(paths: list) -> list:
+    """ Empreintes de plusieurs fichiers (le cache n'est enregistré qu'une fois, à la fin) """
+    fingerprints = [file_fingerprint(path, save=False) for path in paths]
+    fingerprint_cache.save()
+    return fingerprints
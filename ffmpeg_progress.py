@@ -0,0 +1,72 @@
+def with_progress_args(cmd: list) -> list:
+    """ Ajoute "-progress pipe:1 -nostats" juste après "ffmpeg" : l'avancement arrive sur stdout """
+    return [cmd[0], "-progress", "pipe:1", "-nostats"] + list(cmd[1:])
+
+
+def parse_progress_blocks(stream):
+    """
+    Lit la sortie de -progress au fil de l'eau : des lignes "clé=valeur",
+    chaque bloc se terminant par "progress=continue" (ou "progress=end" pour le dernier)
+    """
+    block = {}
+    for line in stream:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value
+        if key == "progress":
+            yield block
+            block = {}
+
+
+def _to_float(value: str, suffix: str = ""):
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:  # "N/A" tant que ffmpeg n'a pas de mesure
+        return None
+
+
+def format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+
+class JobProgress:
+    """ État d'avancement d'un job, construit à partir d'un bloc de -progress """
+    def __init__(self, block: dict, duration: float = None):
+        self.frame = int(_to_float(block.get("frame", "0")) or 0)
+        self.fps = _to_float(block.get("fps", "N/A"))
+        self.speed = _to_float(block.get("speed", "N/A"), suffix="x")
+        self.bitrate = block.get("bitrate", "N/A").strip()
+        self.finished = block.get("progress") == "end"
+
+        # out_time_us (out_time_ms est en réalité aussi en microsecondes)
+        out_time_us = _to_float(block.get("out_time_us", block.get("out_time_ms", "N/A")))
+        self.out_time = out_time_us / 1_000_000 if out_time_us is not None and out_time_us >= 0 else None
+
+        self.percent = None
+        self.eta = None
+        if duration and self.out_time is not None:
+            self.percent = min(100.0, 100 * self.out_time / duration)
+            if self.speed:
+                self.eta = max(0.0, (duration - self.out_time) / self.speed)
+        if self.finished:
+            self.percent, self.eta = 100.0, 0.0
+
+
+    def __str__(self) -> str:
+        parts = []
+        if self.percent is not None:
+            parts.append(f"{self.percent:.0f}%")
+        parts.append(f"image {self.frame}")
+        if self.fps is not None:
+            parts.append(f"{self.fps:.1f} fps")
+        if self.speed is not None:
+            parts.append(f"x{self.speed:.2f}")
+        parts.append(self.bitrate)
+        if self.eta is not None:
+            parts.append(f"reste {format_seconds(self.eta)}")
+        return " | ".join(parts)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import time
+
+from ffmpeg_media import build_job, expected_duration, job_cache_inputs, job_input_files
+from ffmpeg_probe import CACHE_DIR
+
+QUEUE_DB = CACHE_DIR / "jobs.sqlite3"
+
+# pending : en attente, running : en cours (ou interrompu si l'application a été fermée),
+# done : réussi, failed : en erreur, skipped : identique à un job déjà fait
+JOB_STATUSES = ("pending", "running", "done", "failed", "skipped")
+
+
+def inputs_fingerprint(input_paths: list) -> str:
+    """
+    Empreinte des fichiers lus par un job (voir job_input_files) : chemin, taille et date de modification
+    de chacun, sans relire leur contenu (appelée depuis l'interface) ; un chemin introuvable compte pour son texte
+    """
+    sha = hashlib.sha1()
+    for path in input_paths:
+        sha.update(path.encode("utf-8"))
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            sha.update(f"|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return sha.hexdigest()
+
+
+def command_key(spec: dict) -> str:
+    """ Empreinte de la commande normalisée : opération, options triées et chemin absolu de la sortie """
+    normalized = {"operation": spec["operation"], "options": spec.get("options", {}),
+                  "output": os.path.abspath(spec["output"])}
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """
+    File de jobs persistante (SQLite) : entrées, options, statut, horaires et code de retour de chaque job.
+    Après un arrêt brutal, resume() relance les jobs en attente ou interrompus.
+    Prévue pour une seule application à la fois sur la même base.
+    """
+    def __init__(self, db_path=QUEUE_DB):
+        os.makedirs(os.path.dirname(str(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(str(db_path))
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    spec TEXT NOT NULL,
+                    input_hash TEXT NOT NULL,
+                    command_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    exit_code INTEGER,
+                    error TEXT
+                )""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (input_hash, command_key)")
+
+
+    def add(self, spec: dict):
+        """
+        Enregistre un job en attente et renvoie son id, ou None s'il est inutile :
+        même entrée et même commande qu'un job réussi dont la sortie existe, ou qu'un job pas encore terminé
+        """
+        input_hash = inputs_fingerprint(job_input_files(spec))
+        key = command_key(spec)
+        previous = self.connection.execute(
+            "SELECT status FROM jobs WHERE input_hash = ? AND command_key = ? AND status IN ('pending', 'running', 'done')"
+            " ORDER BY id DESC LIMIT 1", (input_hash, key)).fetchone()
+
+        status = "pending"
+        if previous is not None and (previous["status"] != "done" or os.path.exists(spec["output"])):
+            status = "skipped"
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (spec, input_hash, command_key, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (json.dumps(spec), input_hash, key, status, time.time()))
+        return cursor.lastrowid if status == "pending" else None
+
+
+    def resume(self) -> list:
+        """ Remet en attente les jobs interrompus et renvoie tous les jobs en attente : [(id, spec)] """
+        with self.connection:
+            self.connection.execute("UPDATE jobs SET status = 'pending', started_at = NULL WHERE status = 'running'")
+        rows = self.connection.execute("SELECT id, spec FROM jobs WHERE status = 'pending' ORDER BY id").fetchall()
+        return [(row["id"], json.loads(row["spec"])) for row in rows]
+
+
+    def mark_running(self, job_id: int) -> None:
+        with self.connection:
+            self.connection.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                                    (time.time(), job_id))
+
+
+    def mark_finished(self, job_id: int, error: Exception = None) -> None:
+        if error is None:
+            status, exit_code, message = "done", 0, None
+        else:
+            status, message = "failed", str(error)
+            exit_code = error.returncode if isinstance(error, subprocess.CalledProcessError) else None
+        with self.connection:
+            self.connection.execute("UPDATE jobs SET status = ?, finished_at = ?, exit_code = ?, error = ? WHERE id = ?",
+                                    (status, time.time(), exit_code, message, job_id))
+
+
+    def jobs(self, status: str = None) -> list:
+        """ Historique des jobs (les plus récents d'abord), éventuellement filtré par statut """
+        if status is None:
+            return self.connection.execute("SELECT * FROM jobs ORDER BY id DESC").fetchall()
+        return self.connection.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id DESC", (status,)).fetchall()
+
+
+    def submit(self, executor, job_id: int, spec: dict, on_success=None, on_error=None, on_progress=None) -> None:
+        """
+        Confie le job à l'executor (JobExecutor), qui construit sa commande dans un de ses threads ;
+        le statut est mis à jour dans la base à la fin, puis les callbacks sont appelés
+        """
+        def job_succeeded(out):
+            self.mark_finished(job_id)
+            if on_success is not None:
+                on_success(out)
+
+        def job_failed(out, error):
+            self.mark_finished(job_id, error)
+            if on_error is not None:
+                on_error(out, error)
+
+        try:
+            duration = expected_duration(spec)
+        except (KeyError, TypeError, ValueError):
+            duration = None  # options incorrectes : l'erreur est signalée par build_job
+
+        cache_inputs = job_cache_inputs(spec)
+
+        self.mark_running(job_id)
+        executor.submit(lambda: build_job(spec), spec["output"], on_success=job_succeeded, on_error=job_failed,
+                        on_progress=on_progress, input_path=spec["inputs"][0], duration=duration,
+                        cache_inputs=cache_inputs)
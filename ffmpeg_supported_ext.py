@@ -1,20 +1,9 @@
 
 
 def get_ext(file):
-
+    """ Lignes de "ffmpeg -formats" enregistrées dans un fichier -> [".nom", ...] """
     with open(file, "r") as file:
-        gigalist = file.readlines()
-        for giga_idx in range(len(gigalist)):
-            gigalist[giga_idx] = "." + gigalist[giga_idx][5:]
-
-            string = ""
-            idx = 0
-            while gigalist[giga_idx][idx] != " ":
-                string += gigalist[giga_idx][idx]
-                idx += 1
-            gigalist[giga_idx] = string
-
-        return gigalist
+        return ["." + line[5:].split(" ", 1)[0] for line in file]
 
 list_ffmpeg_demuxer_supported = ['.3dostr', '.4xm', '.aa', '.aac', '.aax', '.ac3', '.ac4', '.ace', '.acm', '.act',
                                  '.adf', '.adp', '.ads', '.adx', '.aea', '.afc', '.aiff', '.aix', '.alaw', '.alias_pix',
@@ -84,30 +73,74 @@ list_ffmpeg_muxer_supported = ['.3g2', '.3gp', '.a64', '.ac3', '.ac4', '.adts',
                                '.webm_dash_manifest', '.webp', '.webvtt', '.wsaud', '.wtv', '.wv', '.yuv4mpegpipe']
 
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+# Codecs que chaque conteneur de sortie accepte sans réencodage (None : le conteneur accepte tout)
+_codecs_mp4 = {"video": {"h264", "hevc", "mpeg4", "av1", "vp9", "mpeg2video", "mpeg1video", "mjpeg"},
+               "audio": {"aac", "mp3", "ac3", "eac3", "alac", "opus", "flac", "mp2"},
+               "subtitle": {"mov_text"}}
+_codecs_mov = {"video": _codecs_mp4["video"] | {"prores", "dnxhd", "qtrle", "png", "rawvideo"},
+               "audio": _codecs_mp4["audio"] | {"pcm_s16le", "pcm_s24le", "pcm_s16be", "pcm_s24be"},
+               "subtitle": {"mov_text"}}
+_codecs_mpegts = {"video": {"h264", "hevc", "mpeg2video", "mpeg1video", "av1"},
+                  "audio": {"aac", "mp3", "mp2", "ac3", "eac3", "opus"},
+                  "subtitle": {"dvb_subtitle", "dvb_teletext"}}
+_codecs_webm = {"video": {"vp8", "vp9", "av1"}, "audio": {"vorbis", "opus"}, "subtitle": {"webvtt"}}
+_codecs_ogg = {"video": {"theora", "vp8"}, "audio": {"vorbis", "opus", "flac", "speex"}, "subtitle": set()}
+
+dic_muxer_codecs = {
+    ".mp4": _codecs_mp4, ".m4v": _codecs_mp4, ".3gp": _codecs_mp4, ".3g2": _codecs_mp4,
+    ".mov": _codecs_mov,
+    ".mkv": None, ".matroska": None, ".nut": None,
+    ".webm": _codecs_webm,
+    ".ts": _codecs_mpegts, ".m2ts": _codecs_mpegts, ".mpegts": _codecs_mpegts,
+    ".flv": {"video": {"h264", "flv1", "vp6f"}, "audio": {"aac", "mp3", "nellymoser", "speex"}, "subtitle": set()},
+    ".avi": {"video": {"mpeg4", "h264", "mjpeg", "msmpeg4v2", "msmpeg4v3", "huffyuv", "rawvideo"},
+             "audio": {"mp3", "ac3", "mp2", "pcm_s16le", "pcm_u8"}, "subtitle": set()},
+    ".ogg": _codecs_ogg, ".ogv": _codecs_ogg,
+    ".opus": {"video": set(), "audio": {"opus"}, "subtitle": set()},
+    ".mp3": {"video": set(), "audio": {"mp3"}, "subtitle": set()},
+    ".m4a": {"video": set(), "audio": {"aac", "alac"}, "subtitle": set()},
+    ".aac": {"video": set(), "audio": {"aac"}, "subtitle": set()},
+    ".adts": {"video": set(), "audio": {"aac"}, "subtitle": set()},
+    ".flac": {"video": set(), "audio": {"flac"}, "subtitle": set()},
+    ".wav": {"video": set(), "audio": {"pcm_s16le", "pcm_s24le", "pcm_s32le", "pcm_f32le", "pcm_u8", "pcm_alaw",
+                                       "pcm_mulaw"}, "subtitle": set()},
+    ".gif": {"video": {"gif"}, "audio": set(), "subtitle": set()},
+}
+
+# Encodeurs utilisés quand un flux doit être réencodé pour entrer dans le conteneur
+_encoders_mp4 = {"video": "libx264", "audio": "aac", "subtitle": "mov_text"}
+dic_muxer_default_encoders = {
+    ".mp4": _encoders_mp4, ".m4v": _encoders_mp4, ".mov": _encoders_mp4, ".3gp": _encoders_mp4, ".3g2": _encoders_mp4,
+    ".mkv": {"video": "libx264", "audio": "aac", "subtitle": "ass"},
+    ".matroska": {"video": "libx264", "audio": "aac", "subtitle": "ass"},
+    ".webm": {"video": "libvpx-vp9", "audio": "libopus", "subtitle": "webvtt"},
+    ".ts": {"video": "libx264", "audio": "aac"}, ".m2ts": {"video": "libx264", "audio": "aac"},
+    ".mpegts": {"video": "libx264", "audio": "aac"},
+    ".flv": {"video": "libx264", "audio": "aac"},
+    ".avi": {"video": "mpeg4", "audio": "libmp3lame"},
+    ".ogg": {"video": "libtheora", "audio": "libvorbis"}, ".ogv": {"video": "libtheora", "audio": "libvorbis"},
+    ".opus": {"audio": "libopus"}, ".mp3": {"audio": "libmp3lame"}, ".m4a": {"audio": "aac"},
+    ".aac": {"audio": "aac"}, ".adts": {"audio": "aac"}, ".flac": {"audio": "flac"},
+    ".wav": {"audio": "pcm_s16le"}, ".gif": {"video": "gif"},
+}
+
+# Sous-titres texte (convertibles d'un format à l'autre), par opposition aux sous-titres image
+list_text_subtitle_codecs = ["subrip", "ass", "ssa", "mov_text", "webvtt", "text"]
+
+# Filtres de bitstream nécessaires quand on copie un flux d'un conteneur à un autre (remux)
+# (format du bitstream dans la source, codec) -> filtre, selon le conteneur de destination
+dic_remux_bsf_annexb = {"h264": "h264_mp4toannexb", "hevc": "hevc_mp4toannexb"}
+list_annexb_muxers = [".ts", ".m2ts", ".mpegts"]
+list_adts_demuxers = ["mpegts", "aac"]
+list_asc_muxers = [".mp4", ".m4v", ".mov", ".m4a", ".3gp", ".3g2", ".flv"]
+
+# Extensions des fichiers vidéo (concaténation d'un dossier : les autres fichiers sont ignorés)
+list_video_exts = [".mp4", ".m4v", ".mov", ".mkv", ".webm", ".avi", ".ts", ".m2ts", ".mts", ".mpg", ".mpeg", ".vob",
+                   ".flv", ".wmv", ".asf", ".ogv", ".3gp", ".3g2", ".mxf", ".dv"]
+
+
+# Encodeur correspondant à chaque codec (vidéo ou audio), pour réencoder un morceau à l'identique de la source
+dic_codec_encoders = {"h264": "libx264", "hevc": "libx265", "mpeg4": "mpeg4", "mpeg2video": "mpeg2video",
+                      "vp8": "libvpx", "vp9": "libvpx-vp9", "av1": "libaom-av1", "mjpeg": "mjpeg",
+                      "prores": "prores_ks", "theora": "libtheora", "aac": "aac", "mp3": "libmp3lame",
+                      "opus": "libopus", "vorbis": "libvorbis", "flac": "flac", "ac3": "ac3"}
@@ -1,18 +1,67 @@
 import os.path
-import subprocess
-from tkinter import BOTTOM, Button, Entry, END, filedialog, font, Frame, Tk, Label, LEFT, Radiobutton, Scale, StringVar
+from tkinter import BOTTOM, BooleanVar, Button, Checkbutton, Entry, END, filedialog, font, Frame, Tk, Label, LEFT, \
+    OptionMenu, Radiobutton, Scale, StringVar
 from pathlib import Path
-from ffmpeg_supported_ext import list_ffmpeg_demuxer_supported, list_ffmpeg_muxer_supported
-
-def run_cmd_line(string, out):
-    try:
-        label_conversion_en_cours.pack(side=BOTTOM)
-        fen.update()
-        subprocess.run(string, check=True)
-        print(f"Conversion réussie : {out} a été créé.")
+from ffmpeg_capabilities import get_capabilities
+from ffmpeg_jobs import JobExecutor, default_max_workers
+from ffmpeg_batch import batch_parallelism, build_batch_jobs, list_batch_inputs
+from ffmpeg_queue import JobQueue
+from ffmpeg_presets import EncoderPreset, crf_from_compression, dic_presets, dic_speeds, preset_from_slider
+
+# Nombre maximum de commandes ffmpeg exécutées en même temps
+NB_JOBS_PARALLELES = default_max_workers()
+
+def run_job(operation: str, input_file: str, output_file: str, **options) -> None:
+    """
+    Enregistre le job dans la file persistante puis le lance en arrière-plan
+    (la fenêtre reste utilisable pendant la conversion)
+    """
+    spec = {"operation": operation, "inputs": [input_file], "output": output_file, "options": options}
+    job_id = job_queue.add(spec)
+    if job_id is None:
+        print(f"Job ignoré : {output_file} a déjà été (ou est en train d'être) produit avec les mêmes réglages.")
+        return
+    submit_job(job_id, spec)
+
+def submit_job(job_id: int, spec: dict) -> None:
+    show_progress(spec["output"], "en attente")
+    job_queue.submit(executor, job_id, spec, on_success=conversion_reussie, on_error=conversion_echouee,
+                     on_progress=show_progress)
+    update_label_conversion_en_cours()
+
+def conversion_reussie(out) -> None:
+    print(f"Conversion réussie : {out} a été créé.")
+    hide_progress(out)
+
+def conversion_echouee(out, error) -> None:
+    print(f"Erreur lors de l'exécution de FFmpeg ({out}) : {error}")
+    hide_progress(out)
+
+def show_progress(out, progress) -> None:
+    """ Affiche (ou met à jour) la ligne d'avancement du job """
+    if out not in dic_labels_progress:
+        dic_labels_progress[out] = Label(div_progress)
+        dic_labels_progress[out].pack(anchor="w")
+    dic_labels_progress[out]["text"] = f"{os.path.basename(out)} : {progress}"
+
+def hide_progress(out) -> None:
+    label_progress = dic_labels_progress.pop(out, None)
+    if label_progress is not None:
+        label_progress.destroy()
+
+def update_label_conversion_en_cours() -> None:
+    nb_jobs = executor.nb_jobs_running
+    if nb_jobs == 0:
         label_conversion_en_cours.pack_forget()
-    except subprocess.CalledProcessError as e:
-        print(f"Erreur lors de l'exécution de FFmpeg : {e}")
+        return
+    label_conversion_en_cours["text"] = f"{nb_jobs} action(s) en cours"
+    label_conversion_en_cours.pack(side=BOTTOM)
+
+def poll_jobs() -> None:
+    """ Récupère les jobs terminés (dans le thread de Tk) puis se reprogramme """
+    executor.poll()
+    update_label_conversion_en_cours()
+    fen.after(100, poll_jobs)
 
 def check_path_entries_correct() -> bool:
     """ Checke si les les entrys pour les chemins de fichiers contiennent la bonne valeur """
@@ -40,12 +89,13 @@ def check_path_entries_correct() -> bool:
     ext1 = entry_input_file_ext.get()
     ext2 = entry_output_file_ext.get()
 
-    if not ext1 in list_ffmpeg_demuxer_supported:
+    capabilities = get_capabilities()
+    if not capabilities.can_demux_ext(ext1):
         label_error_input_file["text"] += f"| L'extension \"{ext1}\" n'est pas supportée"
         label_error_input_file.update()
         errors = True
 
-    if not ext2 in list_ffmpeg_muxer_supported:
+    if not capabilities.can_mux_ext(ext2):
         label_error_output_file["text"] += f"| L'extension \"{ext2}\" n'est pas supportée"
         label_error_output_file.update()
         errors = True
@@ -92,91 +142,6 @@ def input_file_exist(file_path) -> bool:
 
 
 
-class MediaObject:
-    def __init__(self, input_path, output_path):
-        self.input_path = input_path
-        self.output_path = output_path
-
-
-    def compress(self) -> str:
-        """ Compression du fichier """
-        cmd_command = f"ffmpeg -i {self.input_path} {self.output_path}"
-        return cmd_command
-
-
-    def convert(self, lossy: bool) -> str:
-        """ Conversion (voire compression) du fichier """
-        if lossy:
-            cmd_command = f"ffmpeg -i {self.input_path} {self.output_path}"
-        else:
-            cmd_command = f"ffmpeg -i {self.input_path} -c:v copy -c:a copy {self.output_path}"
-        return cmd_command
-
-
-    def extract_image(self):
-        """ Extraction de la piste image """
-        cmd_command = f"ffmpeg -i {self.input_path} -an -c:v copy {self.output_path}"
-        return cmd_command
-
-
-    def extract_audio(self):
-        """ Extraction de la piste audio """
-        cmd_command = f"ffmpeg -i {self.input_path} -vn -c:a copy {self.output_path}"
-        return cmd_command
-
-
-    def rotate(self, rotation: str = None):
-        """ Rotation de l'image """
-        dic_rotations = {"right": "transpose=1",
-                        "left": "transpose=2",
-                        "180": "transpose=2,transpose=2",
-                        "haut-bas": "vflip",
-                        "gauche-droite": "hflip"}
-
-        cmd_command = f"ffmpeg -i {self.input_path} -vf \"{dic_rotations[rotation]}\" {self.output_path}"
-
-        return cmd_command
-
-
-    def cut_duration(self, begin: str, end: str): # ex : 05h20m05s
-        """ Cut de la durée excédente """
-        begin_s = int(begin[0:2]) * 3600 + int(begin[3:5]) * 60 + int(begin[6:8])
-        end_s = int(end[0:2]) * 3600 + int(end[3:5]) * 60 + int(end[6:8])
-
-        duration_s = end_s - begin_s
-        duration_h = duration_s // 3600
-        duration_s %= 3600
-        duration_m = duration_s // 60
-        duration_s %= 60
-
-        duration = f"{duration_h:02}:{duration_m:02}:{duration_s:02}"
-        cmd_command = f"ffmpeg -ss {begin} -i {self.input_path} -t {duration} -c copy {self.output_path}"
-
-        return cmd_command
-
-
-    def crop(self, width: str, height: str, x: str="0", y: str="0"):
-        """ Rognage de la vidéo """
-        cmd_command = f"ffmpeg -i {self.input_path} -vf \"crop={width}:{height}:{x}:{y}\" {self.output_path}"
-        return cmd_command
-
-
-class FilesInput:
-    def __init__(self, input_path: str, output_path: str):
-        self.input_path = input_path
-        self.output_path = output_path
-
-
-    def concatenate_images(self, framerate: str, quality: str):
-        cmd_command = f"ffmpeg -framerate {framerate} -i /{self.input_path} -c:v libx264 -crf {quality} -pix_fmt yuv420p {self.output_path}"
-        return cmd_command
-
-
-    def concatenate_videos(self):
-        cmd_command = f"ffmpeg -f concat -safe 0 -i {self.input_path} -c copy {self.output_path}"
-        return cmd_command
-
-
 def hide_one_input_file_divs():
     Compress().hide()
     Convert().hide()
@@ -186,6 +151,39 @@ def hide_one_input_file_divs():
     Crop().hide()
 
 
+class PresetSelector:
+    """ Choix vitesse/taille et préréglages nommés, à côté du slider de compression """
+    def __init__(self, parent):
+        self.div_preset = Frame(parent)
+        self.label_preset = Label(self.div_preset, text="Préréglage : ")
+        self.preset_value = StringVar()
+        self.preset_value.set("personnalisé")
+        self.menu_preset = OptionMenu(self.div_preset, self.preset_value, "personnalisé", *dic_presets)
+
+        self.div_speed = Frame(parent)
+        self.label_speed = Label(self.div_speed, text="Priorité : ")
+        self.speed_value = StringVar()
+        self.speed_value.set("équilibré")
+        self.radiobuttons_speed = [Radiobutton(self.div_speed, text=speed, variable=self.speed_value, value=speed)
+                                   for speed in dic_speeds]
+
+    def show(self):
+        self.div_speed.pack()
+        self.label_speed.pack(side=LEFT)
+        for radiobutton in self.radiobuttons_speed:
+            radiobutton.pack(side=LEFT)
+
+        self.div_preset.pack(pady=5)
+        self.label_preset.pack(side=LEFT)
+        self.menu_preset.pack(side=LEFT)
+
+    def get_preset(self, compression: int) -> EncoderPreset:
+        """ Préréglage nommé s'il y en a un de choisi, sinon celui du slider et de la priorité """
+        if self.preset_value.get() in dic_presets:
+            return dic_presets[self.preset_value.get()]
+        return preset_from_slider(compression, self.speed_value.get())
+
+
 class Compress:
     def __init__(self):
         self.div_compress = div_compress
@@ -193,6 +191,11 @@ class Compress:
         self.div_slider = Frame(div_compress)
         self.label_qualite = Label(self.div_slider, text="Compression :")
         self.slider_quality = Scale(self.div_slider, from_=0, to=100, orient='horizontal')
+        self.preset_selector = PresetSelector(div_compress)
+
+        self.chunked_value = BooleanVar()
+        self.checkbutton_chunked = Checkbutton(div_compress, text="encoder par morceaux en parallèle (longues vidéos)",
+                                               variable=self.chunked_value)
 
         self.btn_go = Button(div_compress, text="=>GO", command=self.execute)
 
@@ -203,14 +206,15 @@ class Compress:
         self.div_slider.pack()
         self.label_qualite.pack(side=LEFT)
         self.slider_quality.pack(side=LEFT)
+        self.preset_selector.show()
+        self.checkbutton_chunked.pack()
 
         self.btn_go.pack(side=BOTTOM, pady=10)
 
     def hide(self):
         self.div_compress.pack_forget()
 
-    @staticmethod
-    def execute():
+    def execute(self):
         """
         Actions :
         1/ Checke validité des entries
@@ -226,8 +230,9 @@ class Compress:
         if not input_file_exist(input_file):
             return
 
-        cmd_line = MediaObject(input_path=input_file, output_path=output_file).compress()
-        run_cmd_line(cmd_line, output_file)
+        chunks = (os.cpu_count() or 1) // 2 if self.chunked_value.get() else None
+        preset = self.preset_selector.get_preset(self.slider_quality.get())
+        run_job("compress", input_file, output_file, chunks=chunks, preset=vars(preset))
 
 
 class Convert:
@@ -237,6 +242,7 @@ class Convert:
         self.div_slider = Frame(div_convert)
         self.label_qualite = Label(self.div_slider, text="Compression : ")
         self.slider_quality = Scale(self.div_slider, from_=0, to=100, orient='horizontal')
+        self.preset_selector = PresetSelector(div_convert)
 
         self.btn_go = Button(div_convert, text="=>GO", command=self.execute)
 
@@ -247,14 +253,14 @@ class Convert:
         self.div_slider.pack()
         self.label_qualite.pack(side=LEFT)
         self.slider_quality.pack(side=LEFT)
+        self.preset_selector.show()
 
         self.btn_go.pack(side=BOTTOM, pady=10)
 
     def hide(self):
         self.div_convert.pack_forget()
 
-    @staticmethod
-    def execute():
+    def execute(self):
 
         if not check_path_entries_correct():
             return
@@ -264,8 +270,8 @@ class Convert:
         if not input_file_exist(input_file):
             return
 
-        cmd_line = MediaObject(input_path=input_file, output_path=output_file).convert(lossy=False)
-        run_cmd_line(cmd_line, output_file)
+        preset = self.preset_selector.get_preset(self.slider_quality.get())
+        run_job("convert", input_file, output_file, lossy=False, preset=vars(preset))
 
 class Extract:
     def __init__(self):
@@ -321,11 +327,9 @@ class Extract:
             return
 
         if self.extract_value.get() == "audio":
-            cmd_line = MediaObject(input_path=input_file, output_path=output_file).extract_audio()
+            run_job("extract_audio", input_file, output_file)
         else:
-            cmd_line = MediaObject(input_path=input_file, output_path=output_file).extract_image()
-
-        run_cmd_line(cmd_line, output_file)
+            run_job("extract_image", input_file, output_file)
 
 class Rotate:
 
@@ -404,8 +408,7 @@ class Rotate:
 
         rotation_var = self.rotate_value.get()
 
-        cmd_line = MediaObject(input_path=input_file, output_path=output_file).rotate(rotation=rotation_var)
-        run_cmd_line(cmd_line, output_file)
+        run_job("rotate", input_file, output_file, rotation=rotation_var)
 
 
 class Cut:
@@ -450,6 +453,10 @@ class Cut:
 
         self.label_error2 = Label(self.div_bas, text="Mauvaise valeur (format accepté : \"..H..M..S\")", fg="red")
 
+        self.smart_value = BooleanVar()
+        self.checkbutton_smart = Checkbutton(div_cut, text="coupe précise (réencode seulement les bords)",
+                                             variable=self.smart_value)
+
         self.btn_go = Button(div_cut, text="=>GO", command=self.execute)
 
     def show(self):
@@ -475,6 +482,8 @@ class Cut:
         self.entrysecond2.pack(side=LEFT)
         self.label_s2.pack(side=LEFT)
 
+        self.checkbutton_smart.pack()
+
         self.btn_go.pack(side=BOTTOM, pady=10)
 
     def hide(self):
@@ -516,8 +525,7 @@ class Cut:
         end = f"{hour2}:{minute2}:{second2}"
 
 
-        cmd_line = MediaObject(input_path=input_file, output_path=output_file).cut_duration(begin=begin, end=end)
-        run_cmd_line(cmd_line, output_file)
+        run_job("cut_duration", input_file, output_file, begin=begin, end=end, smart=self.smart_value.get())
 
 
 class Crop:
@@ -643,21 +651,24 @@ class Crop:
         self.label_error_largeur.pack_forget()
         self.label_error_hauteur.pack_forget()
 
-        cmd_line = MediaObject(input_path=input_file, output_path=output_file).crop(width=largeur, height=hauteur, x=x, y=y)
-        run_cmd_line(cmd_line, output_file)
+        run_job("crop", input_file, output_file, width=largeur, height=hauteur, x=x, y=y)
 
 
 
 def hide_all_multiple_inputs_divs():
     div_concatenate.pack_forget()
+    div_batch.pack_forget()
+
+IMAGES_TUTO = "Fichier d'entrée : \"image%03d.jpeg\" (image001.jpeg, image002.jpeg...), motif\n" \
+             "(ex : \"*\" + \".jpeg\") ou liste \"images.txt\" ; numéros manquants et tailles différentes acceptés"
+
 
 class Concatenate:
     def __init__(self):
         self.div_concatenate = div_concatenate
         self.label_compress = Label(self.div_concatenate, text="Concatener : ", font=bold_font)
 
-        self.label_tuto = Label(self.div_concatenate, text=f"Format du nom de fichier d'entrée :\n"
-                                                              f"\"image001.jpeg\" -> \"image%01d.jpeg\"")
+        self.label_tuto = Label(self.div_concatenate, text=IMAGES_TUTO)
 
         self.div_choice = Frame(div_concatenate)
 
@@ -693,18 +704,17 @@ class Concatenate:
     def hide_framerate_quality(self):
         self.div_framerate.pack_forget()
         self.div_slider.pack_forget()
-        self.label_tuto["text"] = f"Format du nom de fichier d'entrée : \"videos.txt\"\n" \
-                                  f"Disposition dans le fichier : \n\n" \
-                                  f"file video1.mp4\n" \
-                                  f"file video2.mp4\n" \
-                                  f"file video3.mp4\n" \
-                                  f"...\n"
+        self.label_tuto["text"] = "Fichier d'entrée : motif des vidéos (ex : \"*\" + \".mp4\", dans l'ordre\n" \
+                                 "naturel : video2 avant video10), ou liste \"videos.txt\" :\n\n" \
+                                 "file video1.mp4\n" \
+                                 "file video2.mp4\n" \
+                                 "...\n\n" \
+                                 "Les vidéos aux paramètres différents des autres sont réencodées"
 
     def show_framerate_quality(self):
         self.div_framerate.pack()
         self.div_slider.pack()
-        self.label_tuto["text"] = f"Format du nom de fichier d'entrée :\n" \
-                                  f"\"image001.jpeg\" -> \"image%01d.jpeg\""
+        self.label_tuto["text"] = IMAGES_TUTO
 
     def show(self):
         hide_all_multiple_inputs_divs()
@@ -761,12 +771,167 @@ class Concatenate:
         path, input_file, output_file = get_main_paths()
 
         if self.concatenate_type.get() == "image":
-            cmd_command = FilesInput(input_path=input_file, output_path=output_file)\
-                .concatenate_images(framerate=framerate, quality=str(quality))
+            run_job("concatenate_images", input_file, output_file,
+                    framerate=framerate, quality=str(crf_from_compression(quality)))
         else:
-            cmd_command = FilesInput(input_path=input_file, output_path=output_file).concatenate_videos()
+            run_job("concatenate_videos", input_file, output_file)
+
+
+# Sens de rotation proposés dans le traitement par lot : texte affiché -> valeur de MediaObject.rotate
+BATCH_ROTATIONS = {"gauche": "left", "droite": "right", "180": "180", "gauche-droite": "gauche-droite",
+                   "haut-bas": "haut-bas"}
+
+
+def is_hms(value: str) -> bool:
+    """ Vérifie le format "hh:mm:ss" """
+    return len(value) == 8 and value[2] == value[5] == ":" and (value[0:2] + value[3:5] + value[6:8]).isdigit()
+
+
+class Batch:
+    def __init__(self):
+        self.div_batch = div_batch
+        self.label_batch = Label(self.div_batch, text="Traiter un dossier : ", font=bold_font)
+
+        self.label_tuto = Label(self.div_batch, text="Fichier d'entrée : motif des fichiers à traiter (ex : \"*\")\n"
+                                                    "Fichier de sortie : nom du sous-dossier de sortie")
+
+        self.div_choice = Frame(self.div_batch)
+        self.label_choice = Label(self.div_choice, text="Opération : ")
+
+        self.operation_value = StringVar()
+        self.operation_value.set("compress")
+
+        self.div_radiobuttons = Frame(self.div_choice)
+        self.radiobuttons = []
+        for operation, text in [("compress", "compresser"), ("convert", "convertir"),
+                                ("extract_audio", "extraire l'audio"), ("rotate", "pivoter"), ("crop", "rogner"),
+                                ("cut_duration", "couper")]:
+            div_radiobutton = Frame(self.div_radiobuttons)
+            radiobutton = Radiobutton(div_radiobutton, variable=self.operation_value, value=operation,
+                                      command=self.show_parameters)
+            label_radiobutton = Label(div_radiobutton, text=text)
+            self.radiobuttons.append((div_radiobutton, radiobutton, label_radiobutton))
+
+        # Paramètres des opérations qui en ont (affichés selon l'opération choisie)
+        self.div_rotate = Frame(self.div_batch)
+        self.label_rotation = Label(self.div_rotate, text="Sens : ")
+        self.rotation_value = StringVar()
+        self.rotation_value.set("gauche")
+        self.optionmenu_rotation = OptionMenu(self.div_rotate, self.rotation_value, *BATCH_ROTATIONS)
+
+        self.div_crop = Frame(self.div_batch)
+        self.crop_entries = []
+        for text, default in [("x = ", "0"), ("y = ", "0"), ("largeur = ", "100"), ("hauteur = ", "100")]:
+            label_crop = Label(self.div_crop, text=text)
+            entry_crop = Entry(self.div_crop, width=4)
+            entry_crop.insert(0, default)
+            self.crop_entries.append((label_crop, entry_crop))
+
+        self.div_cut = Frame(self.div_batch)
+        self.label_begin = Label(self.div_cut, text="de")
+        self.entry_begin = Entry(self.div_cut, width=8)
+        self.entry_begin.insert(0, "00:00:00")
+        self.label_end = Label(self.div_cut, text="à")
+        self.entry_end = Entry(self.div_cut, width=8)
+        self.entry_end.insert(0, "00:00:30")
+        self.smart_value = BooleanVar()
+        self.checkbutton_smart = Checkbutton(self.div_cut, text="coupe précise", variable=self.smart_value)
+
+        self.dic_parameters_divs = {"rotate": self.div_rotate, "crop": self.div_crop, "cut_duration": self.div_cut}
+
+        self.label_error_parameters = Label(self.div_batch, text="Entrez des valeurs correctes (durées : \"hh:mm:ss\")",
+                                            fg="red")
+        self.label_error_files = Label(self.div_batch, text="Aucun fichier ne correspond au motif", fg="red")
+
+        self.btn_go = Button(self.div_batch, text="=>GO", command=self.execute)
+
+    def show(self):
+        hide_all_multiple_inputs_divs()
+        self.div_batch.pack(pady=20)
+        self.label_batch.pack()
+        self.label_tuto.pack(pady=10)
+
+        self.div_choice.pack(pady=10)
+        self.label_choice.pack(side=LEFT)
+        self.div_radiobuttons.pack(side=LEFT)
+        for div_radiobutton, radiobutton, label_radiobutton in self.radiobuttons:
+            div_radiobutton.pack(anchor="w")
+            radiobutton.pack(side=LEFT)
+            label_radiobutton.pack(side=LEFT)
+
+        self.label_rotation.pack(side=LEFT)
+        self.optionmenu_rotation.pack(side=LEFT)
+        for label_crop, entry_crop in self.crop_entries:
+            label_crop.pack(side=LEFT)
+            entry_crop.pack(side=LEFT, padx=(0, 10))
+        self.label_begin.pack(side=LEFT, padx=5)
+        self.entry_begin.pack(side=LEFT)
+        self.label_end.pack(side=LEFT, padx=5)
+        self.entry_end.pack(side=LEFT)
+        self.checkbutton_smart.pack(side=LEFT, padx=10)
+        self.show_parameters()
 
-        run_cmd_line(cmd_command, output_file)
+        self.btn_go.pack(side=BOTTOM, pady=10)
+
+    def show_parameters(self):
+        """ Affiche les champs de l'opération choisie """
+        for div_parameters in self.dic_parameters_divs.values():
+            div_parameters.pack_forget()
+        self.label_error_parameters.pack_forget()
+        div_parameters = self.dic_parameters_divs.get(self.operation_value.get())
+        if div_parameters is not None:
+            div_parameters.pack(pady=10)
+
+    def hide(self):
+        self.div_batch.pack_forget()
+
+    def get_options(self):
+        """ Options de l'opération choisie, None si un champ est incorrect """
+        operation = self.operation_value.get()
+        if operation == "convert":
+            return {"lossy": False}
+        if operation == "rotate":
+            return {"rotation": BATCH_ROTATIONS[self.rotation_value.get()]}
+        if operation == "crop":
+            x, y, largeur, hauteur = (entry_crop.get() for _, entry_crop in self.crop_entries)
+            if any(value == "" or value.isspace() for value in (x, y, largeur, hauteur)):
+                return None
+            return {"width": largeur, "height": hauteur, "x": x, "y": y}
+        if operation == "cut_duration":
+            begin, end = self.entry_begin.get(), self.entry_end.get()
+            if not (is_hms(begin) and is_hms(end)):
+                return None
+            return {"begin": begin, "end": end, "smart": self.smart_value.get()}
+        return {}
+
+    def execute(self):
+
+        if not check_path_entries_correct():
+            return
+
+        path, input_pattern, output_file = get_main_paths()
+
+        options = self.get_options()
+        if options is None:
+            self.label_error_parameters.pack()
+            return
+        self.label_error_parameters.pack_forget()
+
+        input_files = list_batch_inputs(input_pattern)
+        if not input_files:
+            self.label_error_files.pack()
+            return
+        self.label_error_files.pack_forget()
+
+        output_dir = path + entry_output_file_name.get()
+        operation = self.operation_value.get()
+
+        # Le pool de l'application fixe le nb de ffmpeg simultanés : on répartit les coeurs entre eux
+        _, threads = batch_parallelism(len(input_files), max_workers=executor.max_workers)
+        jobs = build_batch_jobs(input_files, output_dir, entry_output_file_ext.get(),
+                                lambda i, o, t: dict(options, threads=t), threads)
+        for job_options, input_file, out in jobs:
+            run_job(operation, input_file, out, **job_options)
 
 
 
@@ -874,18 +1039,33 @@ btn_crop.pack(side=LEFT, padx=3)
 div_multiple_inputs = Frame(div_main) # étant invisible au démarrage, on ne la pack pas
 
 div_concatenate = Frame(div_multiple_inputs)
+div_batch = Frame(div_multiple_inputs)
 
 div_btns_multiple_file_input = Frame(div_multiple_inputs)
 div_btns_multiple_file_input.pack()
 btn_concatenate = Button(div_btns_multiple_file_input, text="Concatener", command=Concatenate().show)
 btn_concatenate.pack(side=LEFT, padx=5)
+btn_batch = Button(div_btns_multiple_file_input, text="Traiter un dossier", command=Batch().show)
+btn_batch.pack(side=LEFT, padx=5)
+
+
 
 
+label_conversion_en_cours = Label(div_main, text="Action en cours", font=bold_font)
+div_progress = Frame(div_main)
+div_progress.pack(side=BOTTOM)
+dic_labels_progress = {}  # fichier de sortie -> label d'avancement du job
 
+executor = JobExecutor(max_workers=NB_JOBS_PARALLELES)
+fen.after(100, poll_jobs)
 
-label_conversion_en_cours = Label(div_main, text="Action en cours (voir cmd pour précisions)", font=bold_font)
+# Reprise des jobs laissés en attente ou interrompus à la dernière fermeture
+job_queue = JobQueue()
+for pending_job_id, pending_spec in job_queue.resume():
+    submit_job(pending_job_id, pending_spec)
 
 fen.mainloop()
+executor.shutdown()
 
 """
 # ajouter changement de couleur aussi
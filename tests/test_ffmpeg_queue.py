@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ffmpeg_queue import JobQueue
+
+
+class FakeExecutor:
+    """ Garde les arguments de submit sans lancer ffmpeg """
+    def __init__(self):
+        self.submitted = []
+
+
+    def submit(self, cmd, out, **kwargs):
+        self.submitted.append((cmd, out, kwargs))
+
+
+def test_add_then_submit(tmp_path):
+    input_path = tmp_path / "entree.mp4"
+    input_path.write_bytes(b"video")
+    spec = {"operation": "compress", "inputs": [str(input_path)], "output": str(tmp_path / "sortie.mp4"),
+            "options": {}}
+
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job_id = queue.add(spec)
+    assert job_id is not None
+    assert queue.add(spec) is None  # même entrée, même commande : déjà en attente
+
+    executor = FakeExecutor()
+    queue.submit(executor, job_id, spec)
+    assert queue.jobs("running")[0]["id"] == job_id
+
+    cmd, out, kwargs = executor.submitted[0]
+    assert callable(cmd) and out == spec["output"]
+    assert kwargs["cache_inputs"] == [str(input_path)]
+
+    kwargs["on_success"](out)
+    assert queue.jobs("done")[0]["id"] == job_id